@@ -1,11 +1,15 @@
+import asyncio
 import logging
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from app.services.pseudonymize import AnonymizationProcessor, EntityRecognizer
-from app.utils.file_reader import get_hr_config
+from typing import List
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query
+from app.services.pseudonymize import AnonymizationProcessor
 from fastapi.responses import JSONResponse
-from app.utils.singleton import AgentSingleton
+from app.utils.session_store import create_session, validate_session_id
+from app.services.pseudonym_store import pseudonym_store
 from dotenv import load_dotenv
 from app.services.cv_extraction_service import CVProcessor
+from app.services.cv_ingestion import CVIngestionPipeline, read_uploads
+from app.utils.executors import INFERENCE, ExecutorSaturatedError, run_in_pool
 import os
 import json
 
@@ -31,44 +35,57 @@ router = APIRouter()
 
 # Initialize services and processors
 processor = CVProcessor(os.getenv("OPENAI_API_KEY"))
-entity_recognizer = EntityRecognizer()
+ingestion = CVIngestionPipeline(
+    processor, output_dir=os.getenv("CV_INGEST_DIR", "assets/candidates")
+)
 
 
 @router.post("/extract")
-async def cv_extraction(cv_file: UploadFile = File(...)):
+async def cv_extraction(
+    session_id: str = Query(None), cv_file: UploadFile = File(...)
+):
+    """
+    Extract and segment an uploaded CV. When `session_id` is given, an
+    interview session using this CV is prepared for `/flow/start`.
+    """
+    if session_id:
+        try:
+            validate_session_id(session_id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
     try:
-        dp = AnonymizationProcessor(entity_recognizer)
+        # The CV shares the pseudonym map of the interview it prepares
+        if session_id:
+            dp = pseudonym_store.get(session_id)
+        else:
+            dp = AnonymizationProcessor()
 
-        updated_config = get_hr_config()
         print("Hiiiiiiiiii")
 
         logger.info("New user registered. HR questions updated.")
 
         pdf_bytes = await cv_file.read()
+        logger.info(f"CV file received ({len(pdf_bytes)} bytes)")
 
-        # Write to a file
-        file_path = f"assets/temp.pdf"
-        with open(file_path, "wb") as f:
-            f.write(pdf_bytes)
-
-        logger.info(f"CV file saved to {file_path}")
-
-        # Pass the file path to extract text from the CV
-        text = processor.extract_text_from_cv(file_path)
+        # Parse the PDF straight from the uploaded bytes, large ones page range by page range
+        text = await CVProcessor.extract_text_from_cv_async(pdf_bytes)
         logger.info(
             "CV text extracted successfully. Extracted text: %s", text[:500]
         )  # Log first 500 characters
 
         # Pseudonymize the extracted CV text
-        pseudonymized_text = dp.anonymize_text(text)
+        pseudonymized_text = await run_in_pool(INFERENCE, dp.anonymize_text, text)
         logger.info(
             "Pseudonymization completed. Pseudonymized text: %s",
             pseudonymized_text,
         )
-        logger.info("Pseudonymized entity dict: %s", dp.entity_map)
+        if session_id:
+            pseudonym_store.save(session_id)
+        logger.info("Pseudonymized entity dict: %s", dp.entries_in(pseudonymized_text))
 
         # Segment the pseudonymized text
-        segmented_text = processor.segment_cv(pseudonymized_text)
+        segmented_text = await processor.segment_cv_async(pseudonymized_text)
         logger.info("CV segmented successfully. Segmented text: %s", segmented_text)
 
         # Depseudonymize the segmented text to get the original data back
@@ -82,15 +99,64 @@ async def cv_extraction(cv_file: UploadFile = File(...)):
         with open("assets/segmented_cv.json", "w") as f:
             json.dump(output, f)
 
-        AgentSingleton.update_instance(updated_config)
+        if session_id:
+            await create_session(session_id, cv_data=output)
+            logger.info("Interview session %s prepared from the CV.", session_id)
 
         return JSONResponse(
             status_code=200,
             content=output,
         )
 
+    except ExecutorSaturatedError as e:
+        logger.warning(f"CV extraction rejected: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e))
+
     except Exception as e:
         logger.error(f"Error during CV extraction: {str(e)}")
         raise HTTPException(
             status_code=500, detail="An error occurred during CV extraction."
         )
+
+
+@router.post("/bulk", status_code=202)
+async def cv_bulk_ingestion(files: List[UploadFile] = File(...)):
+    """
+    Ingest many CVs at once, uploaded as PDF files and/or zip archives of PDFs.
+    The CVs are processed in the background; poll `/bulk/{job_id}` for progress.
+    Each candidate's segmented CV is stored as its own JSON file.
+    """
+    max_bytes = int(float(os.getenv("CV_INGEST_MAX_MB", 500)) * 1024 * 1024)
+    # The uploads are spooled to disk; check their size before reading them into memory
+    if sum(f.size or 0 for f in files) > max_bytes:
+        raise HTTPException(
+            status_code=413, detail=f"The upload is larger than {max_bytes} bytes"
+        )
+    uploads = [(f.filename or "", await f.read()) for f in files]
+    try:
+        cvs = await asyncio.to_thread(
+            read_uploads,
+            uploads,
+            max_files=int(os.getenv("CV_INGEST_MAX_FILES", 1000)),
+            max_file_bytes=int(float(os.getenv("CV_INGEST_MAX_FILE_MB", 20)) * 1024 * 1024),
+            max_bytes=max_bytes,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid upload: {str(e)}")
+    if not cvs:
+        raise HTTPException(status_code=400, detail="No PDF files in the upload")
+
+    job = ingestion.start(cvs)
+    logger.info("Ingestion job %s started with %d CVs", job.job_id, len(cvs))
+    return JSONResponse(status_code=202, content=job.progress())
+
+
+@router.get("/bulk/{job_id}")
+async def cv_bulk_ingestion_status(job_id: str):
+    """
+    Progress of a bulk ingestion job and the result of every CV finished so far.
+    """
+    job = ingestion.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown ingestion job")
+    return job.progress()
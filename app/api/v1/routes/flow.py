@@ -1,13 +1,17 @@
+import asyncio
 import logging
-from fastapi import File, UploadFile, HTTPException, APIRouter
-from fastapi.responses import JSONResponse
-from app.services.stt_service import STT
-from app.services.pseudonymize import AnonymizationProcessor, EntityRecognizer
-from app.utils.singleton import AgentSingleton
-from app.services.tts_service import TextToSpeechService
+from typing import AsyncIterator
+from fastapi import File, UploadFile, HTTPException, APIRouter, Query
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from urllib.parse import quote
+from app.services.pseudonym_store import pseudonym_store
+from app.utils.session_store import session_store, create_session, InterviewSession
+from app.services.transcript_store import transcript_store
+from app.services.tts_prefetch import audio_prefetcher
+from app.utils.executors import INFERENCE, ExecutorSaturatedError, run_in_pool
+from app.utils.audio import decode_audio
+from app.services.stt_parallel import transcribe_audio
 import base64
-import librosa
-import os
 
 # Initialize logger and log to a file
 logger = logging.getLogger(__name__)
@@ -31,59 +35,120 @@ logger.addHandler(console_handler)
 
 router = APIRouter()
 
-# Initialize services
-stt_service = STT()
-entity_recognizer = EntityRecognizer()  # Updated to use EntityRecognizer
-anonymizer_service = AnonymizationProcessor(
-    entity_recognizer
-)  # Updated to use AnonymizationProcessor
-tts_service = TextToSpeechService()
-log_file_path = "logs/conversation.log"
-
-
-# Helper function to save question and answer to file
-def save_question_and_answer(question: str, answer: str = None):
-    with open(log_file_path, "a+") as file:
-        if not answer:
-            file.write(f"**Start of Conversation**\n\nQuestion: {question}\n")
-        else:
-            file.write(f"Answer: {answer}\n\nQuestion: {question}\n")
+def _question_response(session_id: str, status: str, question_text: str) -> Response:
+    """
+    Build the response carrying the next question as a streamed audio/mpeg body.
+
+    The body is the question audio, streamed as it arrives from the TTS
+    provider. The session id, interview status and URL-encoded question text
+    are sent in the X-Session-Id, X-Interview-Status and X-Question-Text
+    headers. A completed interview has no audio and gets a 204.
+    """
+    headers = {"X-Session-Id": session_id, "X-Interview-Status": status}
+    if question_text is None:
+        return Response(status_code=204, headers=headers)
+    headers["X-Question-Text"] = quote(question_text)
+    return StreamingResponse(
+        audio_prefetcher.stream(question_text),
+        media_type="audio/mpeg",
+        headers=headers,
+    )
+
+
+def _clarification_response(session: InterviewSession, sentences: AsyncIterator[str]) -> Response:
+    """
+    Stream a clarification question as audio, sentence by sentence, while it is generated.
+
+    The text is not known when the headers are sent, so X-Question-Text is
+    omitted. The sentences are drained by a task of their own, which adds the
+    question to the transcript once it is complete, even if the client
+    disconnects. The task is kept on the session, and the next answer waits
+    for it, so the transcript stays in order.
+    """
+    session_id = session.session_id
+    queue = asyncio.Queue()
+
+    async def record():
+        spoken = []
+        try:
+            async for sentence in sentences:
+                spoken.append(sentence)
+                await queue.put(sentence)
+        finally:
+            await queue.put(None)
+            if spoken:
+                await asyncio.to_thread(
+                    transcript_store.add_question, session_id, " ".join(spoken)
+                )
+                logger.info("Streamed clarification: %s", " ".join(spoken))
+
+    async def spoken_sentences() -> AsyncIterator[str]:
+        while (sentence := await queue.get()) is not None:
+            yield sentence
+
+    session.pending_turn = asyncio.create_task(record())
+    return StreamingResponse(
+        audio_prefetcher.tts_service.stream_sentences(spoken_sentences()),
+        media_type="audio/mpeg",
+        headers={"X-Session-Id": session_id, "X-Interview-Status": "in_progress"},
+    )
 
 
 @router.post("/start/")
-async def get_first_question():
+async def get_first_question(
+    session_id: str = Query(None), stream: bool = Query(False)
+):
     """
     Get the first question from the chatbot.
     This is called the first time to start the conversation.
+    A new interview session is created unless `session_id` refers to one
+    prepared by the CV upload; the id is returned in the response.
+    With `stream=true` the audio is streamed as the response body instead of
+    being base64-encoded in JSON (see `_question_response`).
     """
     try:
         logger.info("Getting the first question from the chatbot.")
-        chatbot_service = AgentSingleton.get_instance()
-
-        if os.path.exists(log_file_path):
-            os.remove(log_file_path)
-        logger.info("Removed existing conversation log file.")
+        session = session_store.get(session_id) if session_id else None
+        if session is None:
+            session = await create_session(session_id)
+        session_id = session.session_id
+        chatbot_service = session.agent
 
         # Step 1: Get the first question from the chatbot
-        first_question_response = chatbot_service.handle_question_and_answer()
+        first_question_response = (
+            await chatbot_service.handle_question_and_answer_async()
+        )
 
         # Log the first question and the status
         logger.info(f"First question received: {first_question_response['question']}")
         logger.info(f"Status: {first_question_response['status']}")
 
         # No user answer yet, but we save the question
-        save_question_and_answer(first_question_response["question"])
+        await asyncio.to_thread(
+            transcript_store.start_conversation,
+            session_id,
+            first_question_response["question"],
+        )
 
         # Step 2: Convert the question text to speech using TTS
         question_text = first_question_response["question"]
-        audio_content = tts_service.get_sound_of_text(question_text)
+        if stream:
+            audio_prefetcher.prefetch(chatbot_service.upcoming_questions())
+            return _question_response(
+                session_id, first_question_response["status"], question_text
+            )
+        audio_content = await audio_prefetcher.get(question_text)
         logger.info("TTS conversion for the first question completed.")
 
+        # Synthesise the next question while the candidate answers this one
+        audio_prefetcher.prefetch(chatbot_service.upcoming_questions())
+
         # Step 3: Encode audio content in base64 to send as part of the JSON response
         audio_base64 = base64.b64encode(audio_content).decode("utf-8")
 
         # Step 4: Return JSON response with question text and audio content
         response = {
+            "session_id": session_id,
             "status": first_question_response["status"],
             "question_text": question_text,
             "question_audio": audio_base64,
@@ -91,6 +156,9 @@ async def get_first_question():
         logger.info("Returning JSON response with question text and audio.")
         return JSONResponse(content=response)
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     except Exception as e:
         logger.error(f"Error retrieving first question: {str(e)}")
         raise HTTPException(
@@ -99,47 +167,111 @@ async def get_first_question():
 
 
 @router.post("/next_step/")
-async def process_audio(audio_file: UploadFile = File(...)):
+async def process_audio(
+    session_id: str = Query(...),
+    audio_file: UploadFile = File(...),
+    stream: bool = Query(False),
+):
+    """
+    Transcribe the candidate's answer and return the next question.
+    With `stream=true` the audio is streamed as the response body instead of
+    being base64-encoded in JSON (see `_question_response`).
+    """
+    session = session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Interview session not found")
+
+    # Answers of one interview are processed in order
+    async with session.lock:
+        if session.pending_turn is not None:
+            # The previous clarification is recorded before this answer
+            try:
+                await session.pending_turn
+            except Exception as e:
+                logger.error(f"Error streaming clarification: {str(e)}")
+            session.pending_turn = None
+        return await _process_answer(session, audio_file, stream)
+
+
+async def _process_answer(
+    session: InterviewSession, audio_file: UploadFile, stream: bool = False
+):
+    session_id = session.session_id
+    chatbot_service = session.agent
     try:
-        logger.info("Received audio file from frontend")
-        chatbot_service = AgentSingleton.get_instance()
+        logger.info("Received audio file from frontend for session %s", session_id)
 
         # Step 1: Receive audio file from frontend and transcribe it
         audio_bytes = await audio_file.read()
 
-        temp_audio_path = "assets/temp_audio_file.wav"
-        with open(temp_audio_path, "wb") as f:
-            f.write(audio_bytes)
-
-        logger.info("Audio file written to disk at %s", temp_audio_path)
+        # Step 2: Decode the audio in memory to 16 kHz mono samples
+        audio = await run_in_pool(INFERENCE, decode_audio, audio_bytes)
+        logger.info("Audio decoded successfully (%d samples).", len(audio))
 
-        # Step 2: Load the audio file using librosa
-        audio, sr = librosa.load(temp_audio_path, sr=16000)
-        logger.info("Audio loaded successfully with sampling rate of %s.", sr)
-
-        transcribed_text = stt_service.execute(audio)
+        # Decode in the session's language once it is known, skipping detection
+        transcription = await transcribe_audio(audio, language=session.language)
+        transcribed_text = transcription["text"]
+        if session.language is None and transcribed_text.strip():
+            session.language = transcription["language"]
+            logger.info("Pinned session %s to language %s", session_id, session.language)
         logger.info(f"Transcription complete: {transcribed_text}")
 
         # Step 3: Pass the transcription through the anonymizer
-        pseudonymized_text = anonymizer_service.anonymize_text(transcribed_text)
+        # Each interview has its own pseudonym map
+        anonymizer_service = pseudonym_store.get(session_id)
+        pseudonymized_text = await run_in_pool(
+            INFERENCE, anonymizer_service.anonymize_text, transcribed_text
+        )
+        pseudonym_store.save(session_id)
         logger.info(f"Text after anonymization: {pseudonymized_text}")
-        logger.info(f"Entity mapping: {anonymizer_service.entity_map}")
+        logger.info(
+            f"Entity mapping: {anonymizer_service.entries_in(pseudonymized_text)}"
+        )
 
         # Step 4: Send the pseudonymized text to the chatbot
-        chatbot_response = chatbot_service.handle_question_and_answer(
-            pseudonymized_text
-        )
+        if stream:
+            # Clarifications are spoken while they are still being generated
+            chatbot_response = (
+                await chatbot_service.handle_question_and_answer_stream(
+                    pseudonymized_text
+                )
+            )
+        else:
+            chatbot_response = (
+                await chatbot_service.handle_question_and_answer_async(
+                    pseudonymized_text
+                )
+            )
         logger.info(f"Chatbot response: {chatbot_response}")
 
         # Save the question and the user's transcribed and pseudonymized answer
         revanon = anonymizer_service.reverse_anonymization(pseudonymized_text)
         logger.info(f"Reversed anonimyzed: {revanon}")
-        save_question_and_answer(chatbot_response["question"], pseudonymized_text)
+        await asyncio.to_thread(
+            transcript_store.add_answer,
+            session_id,
+            pseudonymized_text,
+            chatbot_response["question"],
+        )
+
+        if stream:
+            if "question_stream" in chatbot_response:
+                return _clarification_response(
+                    session, chatbot_response["question_stream"]
+                )
+            if chatbot_response["question"] is not None:
+                audio_prefetcher.prefetch(chatbot_service.upcoming_questions())
+            return _question_response(
+                session_id,
+                chatbot_response["status"],
+                chatbot_response["question"],
+            )
 
         if chatbot_response["status"] == "completed":
             logger.info("Chatbot conversation completed.")
             return JSONResponse(
                 content={
+                    "session_id": session_id,
                     "status": "completed",
                     "question_text": None,
                     "question_audio": None,
@@ -148,14 +280,18 @@ async def process_audio(audio_file: UploadFile = File(...)):
 
         # Step 5: Convert chatbot's response to speech using TTS
         chatbot_answer = chatbot_response["question"]
-        audio_content = tts_service.get_sound_of_text(chatbot_answer)
+        audio_content = await audio_prefetcher.get(chatbot_answer)
         logger.info("TTS conversion completed.")
 
+        # Synthesise the next question while the candidate answers this one
+        audio_prefetcher.prefetch(chatbot_service.upcoming_questions())
+
         # Step 6: Encode audio content in base64 to send as part of the JSON response
         audio_base64 = base64.b64encode(audio_content).decode("utf-8")
 
         # Step 7: Return JSON response with status, question text, and audio content
         response = {
+            "session_id": session_id,
             "status": chatbot_response["status"],
             "question_text": chatbot_answer,
             "question_audio": audio_base64,  # This is the audio in base64 format
@@ -163,6 +299,21 @@ async def process_audio(audio_file: UploadFile = File(...)):
         logger.info("Returning JSON response with question text and audio.")
         return JSONResponse(content=response)
 
+    except ExecutorSaturatedError as e:
+        logger.warning(f"Audio processing rejected: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e))
+
     except Exception as e:
         logger.error(f"Error processing audio: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error processing audio: {str(e)}")
+
+
+@router.get("/transcript")
+async def get_transcript(session_id: str = Query(...)):
+    """
+    Return the structured question/answer pairs of an interview.
+    """
+    qa_pairs = await asyncio.to_thread(transcript_store.get_qa_pairs, session_id)
+    if not qa_pairs:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+    return JSONResponse(content={"session_id": session_id, "turns": qa_pairs})
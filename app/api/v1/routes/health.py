@@ -0,0 +1,30 @@
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+from app.utils.model_registry import ModelRegistry
+from app.utils.executors import WorkloadPools
+
+router = APIRouter()
+
+
+@router.get("/live", status_code=status.HTTP_200_OK)
+async def liveness():
+    return JSONResponse(status_code=status.HTTP_200_OK, content={"status": "alive"})
+
+
+@router.get("/ready", status_code=status.HTTP_200_OK)
+async def readiness():
+    """
+    Report whether every model in the preload set has finished loading.
+    Returns 503 while warmup is still in progress.
+    """
+    ready = ModelRegistry.is_ready()
+    return JSONResponse(
+        status_code=(
+            status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+        content={
+            "status": "ready" if ready else "loading",
+            "models": ModelRegistry.status(),
+            "pools": WorkloadPools.stats(),
+        },
+    )
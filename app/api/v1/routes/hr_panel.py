@@ -1,4 +1,5 @@
-from fastapi import APIRouter, status, HTTPException
+import asyncio
+from fastapi import APIRouter, status, HTTPException, Query
 from typing import List
 from fastapi.responses import JSONResponse, FileResponse
 import os
@@ -7,10 +8,12 @@ from dotenv import load_dotenv
 from app.utils.file_reader import get_hr_config
 from app.services.hr_report import HRReportGenerator
 from app.models.hr_model import HRInputModel
-from app.utils.singleton import AgentSingleton
+from app.utils.session_store import session_store, validate_session_id
+from app.services.transcript_store import transcript_store
 from app.utils.mail import EmailSender
 from app.models.cv_model import EvaluationResponse
 from app.services.cv_fit import CVJobFitEvaluator
+from app.services.tts_prefetch import audio_prefetcher
 
 load_dotenv()
 
@@ -30,12 +33,26 @@ hr_report_generator = HRReportGenerator(api_key=api_key)
 evaluator = CVJobFitEvaluator(api_key=api_key)
 
 
+def report_paths(session_id: str) -> tuple[str, str]:
+    """
+    Paths of the full and short PDF reports of one interview.
+    """
+    report_dir = os.path.join("assets", "reports", validate_session_id(session_id))
+    return (
+        os.path.join(report_dir, "hr_report.pdf"),
+        os.path.join(report_dir, "hr_report_short.pdf"),
+    )
+
+
 @router.post("/config", status_code=status.HTTP_201_CREATED)
 async def save_config(data: HRInputModel):
     # Write questions to a JSON file
     with open(QUESTIONS_FILE, "w+") as file:
         json.dump(data.model_dump_json(), file)  # Save the list as JSON
 
+    # The fixed questions are the same for every candidate, so render their audio now
+    audio_prefetcher.prefetch(data.questions)
+
     return JSONResponse(
         status_code=status.HTTP_201_CREATED,
         content={
@@ -56,25 +73,37 @@ async def get_config():
 
 
 @router.get("/questions", status_code=status.HTTP_200_OK)
-async def get_config():
+async def get_questions(session_id: str = Query(...)):
 
-    agent = AgentSingleton.get_instance()
+    session = session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Interview session not found")
     return JSONResponse(
         status_code=status.HTTP_200_OK,
-        content={"questions": agent.questions},
+        content={"questions": session.agent.questions},
     )
 
 
 @router.get("/generate-report", status_code=status.HTTP_200_OK)
-async def generate_report():
+async def generate_report(session_id: str = Query(...)):
     """
     Generate a human-readable HR report based on the provided interview conversation.
-    :param conversation: The interview conversation (questions and answers)
+    :param session_id: The interview session whose conversation is evaluated
     :return: A formatted HR report for the manager.
     """
-    conversation_file = "logs/conversation.log"
-    file_path = "assets/hr_report.pdf"
-    file_path_short = "assets/hr_report_short.pdf"
+    try:
+        file_path, file_path_short = report_paths(session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Only this session's turns are read from the transcript store
+    conversation = await asyncio.to_thread(
+        transcript_store.render_conversation, session_id
+    )
+    if not conversation:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
     hr_config = get_hr_config()
     metrics = hr_config["metrics"]
 
@@ -87,16 +116,14 @@ async def generate_report():
             "Strengths and Weaknesses",
             "Technical Knowledge",
         ]
-    # read conversation from file
-    with open(conversation_file, "r") as file:
-        conversation = file.read()
-
-    report_content = hr_report_generator.generate_report(
-        conversation, file_path, criteria=metrics
-    )
-
-    report_content_short = hr_report_generator.generate_criteria_scores(
-        conversation, file_path_short, criteria=metrics
+    # Both reports are independent, so wait for the two completions concurrently
+    report_content, report_content_short = await asyncio.gather(
+        hr_report_generator.generate_report_async(
+            conversation, file_path, criteria=metrics
+        ),
+        hr_report_generator.generate_criteria_scores_async(
+            conversation, file_path_short, criteria=metrics
+        ),
     )
 
     email_sender = EmailSender()
@@ -113,8 +140,11 @@ async def generate_report():
 
 
 @router.get("/download-report", status_code=status.HTTP_200_OK)
-async def download_report():
-    file_path = "assets/hr_report.pdf"
+async def download_report(session_id: str = Query(...)):
+    try:
+        file_path, _ = report_paths(session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not os.path.exists(file_path):
         raise HTTPException(status_code=400, detail="File not found")
     return FileResponse(
@@ -123,8 +153,11 @@ async def download_report():
 
 
 @router.get("/download-report-short", status_code=status.HTTP_200_OK)
-async def download_report():
-    file_path = "assets/hr_report_short.pdf"
+async def download_report_short(session_id: str = Query(...)):
+    try:
+        _, file_path = report_paths(session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if not os.path.exists(file_path):
         raise HTTPException(status_code=400, detail="File not found")
     return FileResponse(
@@ -148,7 +181,7 @@ async def evaluate_fit():
             user_cv = json.load(file)
         hr_config = get_hr_config()
         job_description = hr_config["job_info"]
-        result = evaluator.evaluate_fit(user_cv, job_description)
+        result = await evaluator.evaluate_fit_async(user_cv, job_description)
 
         return EvaluationResponse(**result)
     except Exception as e:
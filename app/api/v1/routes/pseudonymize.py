@@ -1,30 +1,301 @@
-from fastapi import APIRouter
+import asyncio
+import json
+import os
+from typing import AsyncIterator, List
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from app.models.pseudonymize_model import (
     ProcessTextRequest,
     ProcessTextResponse,
+    ProcessTextBatchRequest,
     DepseudonymizeTextRequest,
     DepseudonymizeTextResponse,
+    DepseudonymizeTextBatchRequest,
 )
-from app.services.pseudonymize import AnonymizationProcessor, EntityRecognizer
+from app.services.pseudonymize import AnonymizationProcessor, Substitution, ner_cache
+from app.services.pseudonym_store import pseudonym_store
+from app.utils.model_registry import ModelRegistry
+from app.utils.session_store import validate_session_id
+from app.utils.executors import INFERENCE, ExecutorSaturatedError, run_in_pool
 
-# Initialize the entity recognizer and anonymization processor
-entity_recognizer = EntityRecognizer()
-processor = AnonymizationProcessor(entity_recognizer)
 router = APIRouter()
 
+# Texts whose entities are detected in one call to the model
+BATCH_ITEMS = int(os.getenv("PSEUDONYMIZE_BATCH_ITEMS", 32))
+# Largest batch request body accepted
+MAX_BODY_BYTES = int(float(os.getenv("PSEUDONYMIZE_BATCH_MAX_MB", 32)) * 1024 * 1024)
+
+
+def get_processor(scope_id: str = None) -> AnonymizationProcessor:
+    """
+    Return the processor of a scope, or a fresh one for a single request.
+    """
+    if scope_id is None:
+        return AnonymizationProcessor()
+    try:
+        validate_session_id(scope_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return pseudonym_store.get(scope_id)
+
 
 # Route to pseudonymize text
 @router.post("/pseudonymize", response_model=ProcessTextResponse)
 async def pseudonymize_text(request: ProcessTextRequest):
-    pseudonymized_text = processor.anonymize_text(request.text)
+    processor = get_processor(request.scope_id)
+    pseudonymized_text = await run_in_pool(
+        INFERENCE, processor.anonymize_text, request.text
+    )
+    if request.scope_id is not None:
+        pseudonym_store.save(request.scope_id)
     return ProcessTextResponse(
         pseudonymized_text=pseudonymized_text,
-        pseudonymized_entity_dict=processor.entity_map,  # Send the entity mapping
+        # Send only the mapping needed to restore this text
+        pseudonymized_entity_dict=processor.entries_in(pseudonymized_text),
+        scope_id=request.scope_id,
     )
 
 
+def _depseudonymize(request: DepseudonymizeTextRequest) -> str:
+    text = request.pseudonymized_text
+    if request.scope_id is not None:
+        text = get_processor(request.scope_id).reverse_anonymization(text)
+    return Substitution(request.pseudonymized_entity_dict).apply(text.lower())
+
+
 # Route to depseudonymize text
 @router.post("/depseudonymize", response_model=DepseudonymizeTextResponse)
 async def depseudonymize_text(request: DepseudonymizeTextRequest):
-    original_text = processor.reverse_anonymization(request.pseudonymized_text)
-    return DepseudonymizeTextResponse(original_text=original_text)
+    return DepseudonymizeTextResponse(original_text=_depseudonymize(request))
+
+
+def _identify_entities_batch(texts: List[str]) -> List[dict]:
+    # Resolved in the pool, so a model that is not loaded yet does not block the event loop
+    return ModelRegistry.get_entity_recognizer().identify_entities_batch(texts)
+
+
+async def _read_body(request: Request) -> bytes:
+    """
+    Read a batch request body, rejecting it with 413 beyond MAX_BODY_BYTES.
+
+    The body is read before streaming the response: the streamed response
+    listens on the same ASGI channel for disconnects and would compete for it.
+    """
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > MAX_BODY_BYTES:
+        raise HTTPException(status_code=413, detail="Request body too large")
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > MAX_BODY_BYTES:
+            raise HTTPException(status_code=413, detail="Request body too large")
+    return bytes(body)
+
+
+def _is_ndjson(request: Request) -> bool:
+    return request.headers.get("content-type", "").startswith("application/x-ndjson")
+
+
+async def _ndjson_lines(body: bytes) -> AsyncIterator[dict]:
+    """
+    Parse a newline-delimited JSON request body line by line.
+    """
+    for line in body.splitlines():
+        if line.strip():
+            yield _loads(line)
+
+
+def _loads(line: bytes):
+    # An invalid line becomes an error result instead of ending the stream
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def _parse(model, item):
+    """
+    Validate one batch item, returning (request, None) or (None, error message).
+    """
+    if not isinstance(item, dict):
+        return None, "Invalid JSON object"
+    try:
+        return model(**item), None
+    except ValidationError as e:
+        return None, str(e)
+
+
+def _ndjson(item: dict) -> str:
+    return json.dumps(item, ensure_ascii=False) + "\n"
+
+
+async def _batches(items: AsyncIterator, size: int) -> AsyncIterator[list]:
+    batch = []
+    async for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _pseudonymize_items(requests: List[ProcessTextRequest]) -> List[dict]:
+    """
+    Pseudonymise a batch of texts in one go: the entities of all texts are
+    detected in one model call, then each text is substituted and every
+    scope touched is saved once. Runs in the INFERENCE pool.
+
+    :return: The result of each request, in order, without its index.
+    """
+    results = [None] * len(requests)
+    processors = {}
+    for position, item in enumerate(requests):
+        try:
+            processors[position] = get_processor(item.scope_id)
+        except HTTPException as e:
+            results[position] = {"error": e.detail}
+
+    entities = _identify_entities_batch([requests[position].text for position in processors])
+    scopes = set()
+    for (position, processor), found in zip(processors.items(), entities):
+        item = requests[position]
+        pseudonymized_text = processor.anonymize_text(item.text, found)
+        results[position] = {
+            "pseudonymized_text": pseudonymized_text,
+            "pseudonymized_entity_dict": processor.entries_in(pseudonymized_text),
+            "scope_id": item.scope_id,
+        }
+        if item.scope_id is not None:
+            scopes.add(item.scope_id)
+    for scope_id in scopes:
+        pseudonym_store.save(scope_id)
+    return results
+
+
+@router.post("/pseudonymize_batch")
+async def pseudonymize_batch(request: Request):
+    """
+    Pseudonymise many texts, streaming one NDJSON result line per text.
+
+    The body is either JSON ({"texts": [...], "scope_id": ...} or a bare
+    array of texts) or, with Content-Type application/x-ndjson, one
+    {"text": ..., "scope_id": ...} object per line, up to
+    PSEUDONYMIZE_BATCH_MAX_MB. Texts are processed in batches of
+    PSEUDONYMIZE_BATCH_ITEMS in the inference pool, and the results of a
+    batch are sent as soon as it is done. Each result line carries the
+    item's index, its pseudonymised text and the entity map of that text
+    alone; items that could not be processed (e.g. when the inference pool
+    is saturated) get an error line instead.
+    """
+    body = await _read_body(request)
+    if _is_ndjson(request):
+        items = _ndjson_lines(body)
+    else:
+        try:
+            data = json.loads(body)
+            # A bare JSON array is the list of texts
+            if isinstance(data, list):
+                data = {"texts": data}
+            batch_request = ProcessTextBatchRequest.model_validate(data)
+        except (ValueError, ValidationError) as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+        async def listed():
+            for text in batch_request.texts:
+                yield {"text": text, "scope_id": batch_request.scope_id}
+
+        items = listed()
+
+    async def results() -> AsyncIterator[str]:
+        index = 0
+        async for batch in _batches(items, BATCH_ITEMS):
+            lines = [None] * len(batch)
+            requests: List[ProcessTextRequest] = []
+            offsets = []
+            for offset, item in enumerate(batch):
+                parsed, error = _parse(ProcessTextRequest, item)
+                if error is not None:
+                    lines[offset] = {"error": error}
+                else:
+                    requests.append(parsed)
+                    offsets.append(offset)
+
+            try:
+                processed = await run_in_pool(INFERENCE, _pseudonymize_items, requests)
+            except ExecutorSaturatedError as e:
+                # The 200 status is already sent, so report the batch's items as failed
+                processed = [{"error": str(e)}] * len(requests)
+            for offset, result in zip(offsets, processed):
+                lines[offset] = result
+            for line in lines:
+                yield _ndjson({"index": index, **line})
+                index += 1
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
+def _depseudonymize_items(items: list) -> List[dict]:
+    """
+    Restore a batch of depseudonymize request objects; runs in a worker thread.
+
+    :return: The result of each item, in order, without its index.
+    """
+    results = []
+    for item in items:
+        parsed, error = _parse(DepseudonymizeTextRequest, item)
+        if error is None:
+            try:
+                results.append({"original_text": _depseudonymize(parsed)})
+                continue
+            except HTTPException as e:
+                error = e.detail
+        results.append({"error": error})
+    return results
+
+
+@router.post("/depseudonymize_batch")
+async def depseudonymize_batch(request: Request):
+    """
+    Restore many texts, streaming one NDJSON result line per item.
+
+    The body is either JSON ({"items": [...]} or a bare array of items) or,
+    with Content-Type application/x-ndjson, one depseudonymize request
+    object per line, up to PSEUDONYMIZE_BATCH_MAX_MB.
+    """
+    body = await _read_body(request)
+    if _is_ndjson(request):
+        items = _ndjson_lines(body)
+    else:
+        try:
+            data = json.loads(body)
+            # A bare JSON array is the list of items
+            if isinstance(data, list):
+                data = {"items": data}
+            batch_request = DepseudonymizeTextBatchRequest.model_validate(data)
+        except (ValueError, ValidationError) as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+        async def listed():
+            for item in batch_request.items:
+                yield item.model_dump()
+
+        items = listed()
+
+    async def results() -> AsyncIterator[str]:
+        index = 0
+        async for batch in _batches(items, BATCH_ITEMS):
+            for result in await asyncio.to_thread(_depseudonymize_items, batch):
+                yield _ndjson({"index": index, **result})
+                index += 1
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
+@router.get("/cache")
+async def ner_cache_stats():
+    """
+    Size and hit rate of the entity recognition cache.
+    """
+    return ner_cache.stats()
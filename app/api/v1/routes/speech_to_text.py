@@ -1,16 +1,19 @@
-import io
+import asyncio
 import logging
-import librosa
-from fastapi import APIRouter, File, UploadFile
-from app.services.stt_service import STT
 import os
+from typing import List
+from fastapi import APIRouter, File, UploadFile, WebSocket, WebSocketDisconnect
+from app.utils.model_registry import ModelRegistry
+from app.utils.executors import INFERENCE, run_in_pool
+from app.utils.audio import decode_audio, pcm16_to_float32
+from app.services.stt_streaming import StreamingTranscriber
+from app.services.stt_parallel import transcribe_audio
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 router = APIRouter()
-model = STT()
 
 
 @router.post("/convert")
@@ -21,23 +24,12 @@ async def speech_to_text(audio_file: UploadFile = File(...)):
         # Step 1: Read the audio file bytes
         audio_bytes = await audio_file.read()
 
-        # Step 2: Write the audio bytes to a temporary file (e.g., .wav format)
-        temp_audio_path = "assets/temp_audio_file.wav"
-        with open(temp_audio_path, "wb") as f:
-            f.write(audio_bytes)
+        # Step 2: Decode the audio in memory to 16 kHz mono samples
+        audio = await run_in_pool(INFERENCE, decode_audio, audio_bytes)
+        logger.info("Audio decoded successfully (%d samples).", len(audio))
 
-        logger.info("Audio file written to disk at %s", temp_audio_path)
-
-        # Step 3: Load the audio file using librosa
-        audio, sr = librosa.load(temp_audio_path, sr=16000)
-        logger.info("Audio loaded successfully with sampling rate of %s.", sr)
-
-        # Optional: You can remove the temp file after loading it if not needed anymore
-        os.remove(temp_audio_path)
-        logger.info("Temporary audio file deleted.")
-
-        # Step 4: Transcribe the audio
-        transcript = model.execute(audio)
+        # Step 3: Transcribe the audio
+        transcript = (await transcribe_audio(audio))["text"]
         logger.info("Transcription complete: %s", transcript)
 
         return {"message": transcript}
@@ -45,3 +37,91 @@ async def speech_to_text(audio_file: UploadFile = File(...)):
     except Exception as e:
         logger.error("Error during transcription: %s", str(e))
         return {"error": str(e)}
+
+
+@router.post("/convert_batch")
+async def speech_to_text_batch(audio_files: List[UploadFile] = File(...)):
+    """
+    Transcribe several uploaded recordings concurrently.
+    Short recordings are batched on the shared model and long ones are split
+    across worker processes. Results are returned in upload order.
+    """
+    logger.info("Received %d audio files for transcription.", len(audio_files))
+
+    async def convert(audio_file: UploadFile) -> dict:
+        try:
+            audio_bytes = await audio_file.read()
+            audio = await run_in_pool(INFERENCE, decode_audio, audio_bytes)
+            transcript = (await transcribe_audio(audio))["text"]
+            return {"filename": audio_file.filename, "message": transcript}
+        except Exception as e:
+            logger.error(
+                "Error during transcription of %s: %s", audio_file.filename, str(e)
+            )
+            return {"filename": audio_file.filename, "error": str(e)}
+
+    return {"results": await asyncio.gather(*(convert(f) for f in audio_files))}
+
+
+@router.websocket("/stream")
+async def speech_to_text_stream(websocket: WebSocket):
+    """
+    Incremental transcription over a WebSocket.
+
+    The client sends binary frames of 16 kHz mono 16-bit little-endian PCM while
+    the candidate speaks, then the text message "end". The server answers with
+    {"type": "partial", "text": ...} messages as audio arrives and a final
+    {"type": "final", "text": ...} message before closing.
+    """
+    await websocket.accept()
+    transcriber = StreamingTranscriber(
+        # Loaded off the event loop if warmup has not finished yet
+        await asyncio.to_thread(ModelRegistry.get_stt),
+        window_seconds=float(os.getenv("STT_STREAM_WINDOW_SECONDS", 15)),
+        step_seconds=float(os.getenv("STT_STREAM_STEP_SECONDS", 1)),
+    )
+    partial_task = None
+    remainder = b""
+
+    async def send_partial():
+        text = await run_in_pool(INFERENCE, transcriber.transcribe_partial)
+        await websocket.send_json({"type": "partial", "text": text})
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("text") is not None:
+                if message["text"].strip().lower() == "end":
+                    break
+                continue
+
+            # Keep an odd trailing byte for the next frame
+            data = remainder + message["bytes"]
+            usable = len(data) - len(data) % 2
+            remainder = data[usable:]
+            transcriber.add_audio(pcm16_to_float32(data[:usable]))
+
+            # Only one partial decode runs at a time; newer audio waits for the next one
+            if transcriber.ready_for_partial() and (
+                partial_task is None or partial_task.done()
+            ):
+                partial_task = asyncio.create_task(send_partial())
+
+        if partial_task is not None:
+            await partial_task
+        final_text = await run_in_pool(INFERENCE, transcriber.finish)
+        logger.info("Streaming transcription complete: %s", final_text)
+        await websocket.send_json({"type": "final", "text": final_text})
+        await websocket.close()
+
+    except WebSocketDisconnect:
+        logger.info("Streaming transcription client disconnected.")
+        if partial_task is not None:
+            partial_task.cancel()
+    except Exception as e:
+        logger.error("Error during streaming transcription: %s", str(e))
+        if partial_task is not None:
+            partial_task.cancel()
+        await websocket.close(code=1011, reason=str(e)[:120])
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Response
+import asyncio
+from fastapi import APIRouter, Query, Response
 from io import BytesIO
 from app.models.tts_stt_model import TextInput
 from app.services.tts_service import TextToSpeechService
@@ -12,7 +13,7 @@ async def text_to_speech(text_input: TextInput):
     try:
         text = text_input.text
 
-        audio_content = model.get_sound_of_text(text)
+        audio_content = await model.get_sound_of_text_async(text)
         audio_buffer = BytesIO(audio_content)
         audio_buffer.seek(0)
 
@@ -23,3 +24,23 @@ async def text_to_speech(text_input: TextInput):
         )
     except Exception as e:
         return {"error": str(e)}
+
+
+@router.get("/cache")
+async def tts_cache_stats():
+    """
+    Size and hit rate of the synthesised audio cache.
+    """
+    return model.cache.stats()
+
+
+@router.delete("/cache")
+async def invalidate_tts_cache(text: str = Query(None)):
+    """
+    Drop the cached audio of one text, or of every text when none is given.
+    """
+    if text is None:
+        await asyncio.to_thread(model.cache.clear)
+    else:
+        await asyncio.to_thread(model.invalidate, text)
+    return model.cache.stats()
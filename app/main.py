@@ -1,3 +1,18 @@
+import sys
+
+if __name__ == "__main__" and "--profile-startup" in sys.argv:
+    # Print the import cost of the API without starting the server. Handled
+    # before the imports below so the report is not preceded by the import it
+    # measures; the measurement itself runs in a fresh interpreter.
+    from app.utils.startup_profile import main as profile_startup
+
+    sys.exit(
+        profile_startup([arg for arg in sys.argv[1:] if arg != "--profile-startup"])
+    )
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.routes import (
@@ -7,12 +22,37 @@ from app.api.v1.routes import (
     hr_panel,
     pseudonymize,
     flow,
+    health,
 )
+from app.utils.model_registry import ModelRegistry
+from app.utils.executors import WorkloadPools
+
+
+logger = logging.getLogger(__name__)
+
+
+async def _warmup():
+    try:
+        await asyncio.to_thread(ModelRegistry.warmup)
+    except Exception:
+        # Readiness keeps reporting 503 for the models that failed to load
+        logger.exception("Model warmup failed")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the shared models in the background; /health/ready reports 503 until they are loaded
+    warmup = asyncio.create_task(_warmup())
+    yield
+    warmup.cancel()
+    WorkloadPools.shutdown()
+
 
 app = FastAPI(
     title="CV Screening and Interview Bot",
     version="1.0.0",
     description="An end-to-end system for CV screening, interviewing using LLMs, and evaluation.",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -22,6 +62,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow specific HTTP methods like 'GET', 'POST' etc.
     allow_headers=["*"],  # Allow specific headers
+    # Streamed question audio carries the question in these headers
+    expose_headers=["X-Session-Id", "X-Interview-Status", "X-Question-Text"],
 )
 
 # Including the individual routes
@@ -33,6 +75,7 @@ app.include_router(
     pseudonymize.router, prefix="/api/v1/pseudonymize", tags=["Pseudonymize"]
 )
 app.include_router(flow.router, prefix="/api/v1/flow", tags=["Flow"])
+app.include_router(health.router, prefix="/api/v1/health", tags=["Health"])
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,20 +1,36 @@
 from pydantic import BaseModel
-from typing import Dict
+from typing import Dict, List, Optional
 
 
 class ProcessTextRequest(BaseModel):
     text: str
+    # Texts sent with the same scope id share pseudonyms; without one the map lives for this request only
+    scope_id: Optional[str] = None
 
 
 class ProcessTextResponse(BaseModel):
     pseudonymized_text: str
+    # Only the entries whose pseudonyms occur in pseudonymized_text
     pseudonymized_entity_dict: Dict[str, str]
+    scope_id: Optional[str] = None
 
 
 class DepseudonymizeTextRequest(BaseModel):
     pseudonymized_text: str
-    pseudonymized_entity_dict: Dict[str, str]
+    pseudonymized_entity_dict: Dict[str, str] = {}
+    # Used to restore pseudonyms that are not in pseudonymized_entity_dict
+    scope_id: Optional[str] = None
 
 
 class DepseudonymizeTextResponse(BaseModel):
     original_text: str
+
+
+class ProcessTextBatchRequest(BaseModel):
+    texts: List[str]
+    # All texts of the batch share the scope's pseudonyms; without one every text has its own map
+    scope_id: Optional[str] = None
+
+
+class DepseudonymizeTextBatchRequest(BaseModel):
+    items: List[DepseudonymizeTextRequest]
@@ -1,4 +1,9 @@
-from openai import OpenAI
+import re
+from typing import AsyncIterator
+from openai import AsyncOpenAI, OpenAI
+
+# Whitespace that follows the end of a sentence
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
 
 
 class ClarificationAgent:
@@ -9,6 +14,7 @@ class ClarificationAgent:
         :param api_key: OpenAI API key for authentication
         """
         self.client = OpenAI(api_key=api_key)
+        self.async_client = AsyncOpenAI(api_key=api_key)
 
     def _generate_clarification_prompt(self, question: str, answer: str) -> str:
         """
@@ -30,6 +36,20 @@ class ClarificationAgent:
         """
         return clarification_prompt
 
+    def _clarification_request(self, question: str, answer: str) -> dict:
+        """
+        Build the completion request shared by the sync, async and streaming clarifications.
+        """
+        return {
+            "model": "gpt-4o",
+            "messages": [
+                {
+                    "role": "assistant",
+                    "content": self._generate_clarification_prompt(question, answer),
+                },
+            ],
+        }
+
     def generate_clarification(self, question: str, evaluation: dict) -> str:
         """
         Generate a clarification or rephrased question based on the evaluation scores.
@@ -38,13 +58,55 @@ class ClarificationAgent:
         :param evaluation: The evaluation dictionary containing scores for relevance, clarity, etc.
         :return: A clarification or rephrased question if necessary
         """
-        clarification_prompt = self._generate_clarification_prompt(question, evaluation)
-
         response = self.client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "assistant", "content": clarification_prompt},
-            ],
+            **self._clarification_request(question, evaluation)
+        )
+
+        return response.choices[0].message.content
+
+    async def generate_clarification_async(self, question: str, evaluation: dict) -> str:
+        """
+        Awaitable version of generate_clarification that does not block the event loop.
+
+        :param question: The original question
+        :param evaluation: The evaluation dictionary containing scores for relevance, clarity, etc.
+        :return: A clarification or rephrased question if necessary
+        """
+        response = await self.async_client.chat.completions.create(
+            **self._clarification_request(question, evaluation)
         )
 
         return response.choices[0].message.content
+
+    async def stream_clarification_async(
+        self, question: str, evaluation: dict, min_chars: int = 20
+    ) -> AsyncIterator[str]:
+        """
+        Stream the clarification question sentence by sentence while it is generated.
+
+        :param question: The original question
+        :param evaluation: The evaluation dictionary containing scores for relevance, clarity, etc.
+        :param min_chars: Shorter sentences are joined with the next one
+        :return: An async iterator over the sentences of the clarification
+        """
+        stream = await self.async_client.chat.completions.create(
+            **self._clarification_request(question, evaluation), stream=True
+        )
+
+        buffer = ""
+        pending = ""
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            buffer += chunk.choices[0].delta.content or ""
+            # The last piece is an unfinished sentence and stays in the buffer
+            *sentences, buffer = SENTENCE_END.split(buffer)
+            for sentence in sentences:
+                pending = f"{pending} {sentence}".strip()
+                if len(pending) >= min_chars:
+                    yield pending
+                    pending = ""
+
+        rest = f"{pending} {buffer}".strip()
+        if rest:
+            yield rest
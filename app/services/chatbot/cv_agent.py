@@ -1,4 +1,4 @@
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 from typing import List
 
 
@@ -10,6 +10,7 @@ class HRCVQuestionAgent:
         :param api_key: OpenAI API key for authentication
         """
         self.client = OpenAI(api_key=api_key)
+        self.async_client = AsyncOpenAI(api_key=api_key)
 
     def _generate_question_prompt(self, resume: dict) -> str:
         """
@@ -28,6 +29,20 @@ class HRCVQuestionAgent:
         """
         return question_prompt
 
+    def _question_request(self, resume: str) -> dict:
+        """
+        Build the completion request shared by generate_questions and generate_questions_async.
+        """
+        return {
+            "model": "gpt-4",
+            "messages": [
+                {
+                    "role": "assistant",
+                    "content": self._generate_question_prompt(resume),
+                },
+            ],
+        }
+
     def generate_questions(self, resume: str) -> List[str]:
         """
         Generate a set of general HR interview questions based on the provided resume.
@@ -36,13 +51,20 @@ class HRCVQuestionAgent:
         :param num_questions: The number of questions to generate (default is 5)
         :return: A list of HR interview questions
         """
-        question_prompt = self._generate_question_prompt(resume)
+        response = self.client.chat.completions.create(**self._question_request(resume))
 
-        response = self.client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "assistant", "content": question_prompt},
-            ],
+        questions = [response.choices[0].message.content]
+        return questions
+
+    async def generate_questions_async(self, resume: str) -> List[str]:
+        """
+        Awaitable version of generate_questions that does not block the event loop.
+
+        :param resume: The candidate's resume content
+        :return: A list of HR interview questions
+        """
+        response = await self.async_client.chat.completions.create(
+            **self._question_request(resume)
         )
 
         questions = [response.choices[0].message.content]
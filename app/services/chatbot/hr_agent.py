@@ -1,5 +1,6 @@
+import asyncio
 from openai import OpenAI
-from typing import Dict
+from typing import Any, Dict, List
 from app.services.chatbot.relevant_agent import HREvaluationAgent
 from app.services.chatbot.clarification_agent import ClarificationAgent
 from app.services.chatbot.cv_agent import HRCVQuestionAgent
@@ -8,36 +9,30 @@ import json
 
 
 class HRQuestionnaireAgent:
-    def __init__(self, api_key: str, config: dict):
+    def __init__(self, api_key: str, config: dict, extra_questions: List[str] = None):
         """
         Initialize the HR Questionnaire Agent as a microservice.
 
         :param api_key: OpenAI API key for authentication.
         :param questions: List of questions prepared by an HR expert.
+        :param extra_questions: CV and technical questions generated in advance.
+            When omitted they are generated synchronously according to the config.
         """
         self.client = OpenAI(api_key=api_key)
 
-        self.questions = config["questions"]
+        self.questions = list(config["questions"])
         self.ask_from_cv = config["ask_from_cv"]
         self.ask_technical = config["ask_technical"]
         self.job_description = config["job_info"]
         if self.ask_from_cv:
             self.cv_agent = HRCVQuestionAgent(api_key)
-            with open("assets/segmented_cv.json", "r") as f:
-                cv_data = json.load(f)
-            new_questions = self.cv_agent.generate_questions(cv_data)
-            for new_question in new_questions:
-                self.questions.append(new_question)
-
         if self.ask_technical:
             self.cv_tech_agent = HRTechnicalQuestionAgent(api_key)
-            with open("assets/segmented_cv.json", "r") as f:
-                cv_data = json.load(f)
-            new_questions = self.cv_tech_agent.generate_questions(
-                cv_data, self.job_description
-            )
-            for new_question in new_questions:
-                self.questions.append(new_question)
+
+        if extra_questions is None:
+            extra_questions = self._generate_extra_questions()
+        for new_question in extra_questions:
+            self.questions.append(new_question)
 
         self.answers = []
         self.current_question_index = 0
@@ -45,6 +40,55 @@ class HRQuestionnaireAgent:
         self.evaluation_agent = HREvaluationAgent(api_key)
         self.clarification_agent = ClarificationAgent(api_key)
 
+    @classmethod
+    async def create_async(
+        cls, api_key: str, config: dict, cv_data: dict = None
+    ) -> "HRQuestionnaireAgent":
+        """
+        Build an agent, generating the CV and technical questions without blocking the event loop.
+
+        :param api_key: OpenAI API key for authentication.
+        :param config: The HR configuration.
+        :param cv_data: The candidate's segmented CV. Read from disk when omitted.
+        :return: A ready to use HRQuestionnaireAgent.
+        """
+        generators = []
+        if config["ask_from_cv"] or config["ask_technical"]:
+            if cv_data is None:
+                cv_data = cls._load_cv()
+            if config["ask_from_cv"]:
+                generators.append(
+                    HRCVQuestionAgent(api_key).generate_questions_async(cv_data)
+                )
+            if config["ask_technical"]:
+                generators.append(
+                    HRTechnicalQuestionAgent(api_key).generate_questions_async(
+                        cv_data, config["job_info"]
+                    )
+                )
+
+        # Both question generators are independent, so run them concurrently
+        results = await asyncio.gather(*generators)
+        extra_questions = [question for result in results for question in result]
+        return cls(api_key, config, extra_questions=extra_questions)
+
+    @staticmethod
+    def _load_cv() -> dict:
+        with open("assets/segmented_cv.json", "r") as f:
+            return json.load(f)
+
+    def _generate_extra_questions(self) -> List[str]:
+        extra_questions = []
+        if self.ask_from_cv:
+            extra_questions.extend(self.cv_agent.generate_questions(self._load_cv()))
+        if self.ask_technical:
+            extra_questions.extend(
+                self.cv_tech_agent.generate_questions(
+                    self._load_cv(), self.job_description
+                )
+            )
+        return extra_questions
+
     def handle_question_and_answer(self, answer: str = None) -> Dict[str, str]:
         """
         Handles both asking the next question and receiving the user's answer.
@@ -52,6 +96,104 @@ class HRQuestionnaireAgent:
         :param answer: The answer provided by the candidate. If None, return the first or next question.
         :return: A dictionary with the next question or evaluation result.
         """
+        response = self._pending_response(answer)
+        if response is not None:
+            return response
+
+        question = self._record_answer(answer)
+
+        evaluation = self.evaluation_agent.evaluate_answer(question, answer)
+
+        if self._needs_clarification(evaluation):
+            follow_up_question = self.clarification_agent.generate_clarification(
+                question, answer
+            )
+            return {
+                "status": "in_progress",
+                "question": follow_up_question,
+            }
+
+        return self._advance()
+
+    async def handle_question_and_answer_async(
+        self, answer: str = None
+    ) -> Dict[str, str]:
+        """
+        Awaitable version of handle_question_and_answer that does not block the event loop.
+
+        :param answer: The answer provided by the candidate. If None, return the first or next question.
+        :return: A dictionary with the next question or evaluation result.
+        """
+        response = self._pending_response(answer)
+        if response is not None:
+            return response
+
+        question = self._record_answer(answer)
+
+        evaluation = await self.evaluation_agent.evaluate_answer_async(
+            question, answer
+        )
+
+        if self._needs_clarification(evaluation):
+            follow_up_question = (
+                await self.clarification_agent.generate_clarification_async(
+                    question, answer
+                )
+            )
+            return {
+                "status": "in_progress",
+                "question": follow_up_question,
+            }
+
+        return self._advance()
+
+    async def handle_question_and_answer_stream(
+        self, answer: str = None
+    ) -> Dict[str, Any]:
+        """
+        Like handle_question_and_answer_async, but a clarification question is not awaited.
+
+        When the answer needs a clarification, the response has "question" set
+        to None and "question_stream", an async iterator over the sentences of
+        the clarification as they are generated.
+
+        :param answer: The answer provided by the candidate. If None, return the first or next question.
+        :return: A dictionary with the next question or evaluation result.
+        """
+        response = self._pending_response(answer)
+        if response is not None:
+            return response
+
+        question = self._record_answer(answer)
+
+        evaluation = await self.evaluation_agent.evaluate_answer_async(
+            question, answer
+        )
+
+        if self._needs_clarification(evaluation):
+            return {
+                "status": "in_progress",
+                "question": None,
+                "question_stream": self.clarification_agent.stream_clarification_async(
+                    question, answer
+                ),
+            }
+
+        return self._advance()
+
+    def upcoming_questions(self, count: int = 1) -> List[str]:
+        """
+        Return the queued questions that follow the current one.
+
+        :param count: Maximum number of questions to return.
+        """
+        start = self.current_question_index + 1
+        return self.questions[start : start + count]
+
+    def _pending_response(self, answer: str = None):
+        """
+        Return the response that does not need an evaluation, or None if the answer must be evaluated.
+        """
         # Check if all questions are completed
         if self.current_question_index >= len(self.questions):
             return {"status": "completed", "question": None}
@@ -63,22 +205,21 @@ class HRQuestionnaireAgent:
                 "status": "in_progress",
                 "question": question,
             }
+        return None
 
-        # Process the provided answer
-        question = self.questions[self.current_question_index]
+    def _record_answer(self, answer: str) -> str:
+        """
+        Store the answer to the current question and return that question.
+        """
         self.answers.append(answer)
+        return self.questions[self.current_question_index]
 
-        evaluation = self.evaluation_agent.evaluate_answer(question, answer)
-
-        if evaluation.get("Relevance", 0) < 5:
-            follow_up_question = self.clarification_agent.generate_clarification(
-                question, answer
-            )
-            return {
-                "status": "in_progress",
-                "question": follow_up_question,
-            }
+    @staticmethod
+    def _needs_clarification(evaluation: dict) -> bool:
+        # An answer with a relevance below 5 gets a clarification question instead of the next one
+        return evaluation.get("Relevance", 0) < 5
 
+    def _advance(self) -> Dict[str, str]:
         # Move to the next question if the answer is relevant
         self.current_question_index += 1
 
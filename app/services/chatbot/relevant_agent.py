@@ -1,4 +1,4 @@
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 import json
 
 
@@ -10,6 +10,7 @@ class HREvaluationAgent:
         :param api_key: OpenAI API key for authentication
         """
         self.client = OpenAI(api_key=api_key)
+        self.async_client = AsyncOpenAI(api_key=api_key)
 
     def _generate_prompt(self, question: str, answer: str) -> str:
         """
@@ -35,6 +36,21 @@ class HREvaluationAgent:
         """
         return prompt
 
+    def _evaluation_request(self, question: str, answer: str) -> dict:
+        """
+        Build the completion request shared by evaluate_answer and evaluate_answer_async.
+        """
+        return {
+            "model": "gpt-4o",
+            "messages": [
+                {
+                    "role": "assistant",
+                    "content": self._generate_prompt(question, answer),
+                },
+            ],
+            "response_format": {"type": "json_object"},
+        }
+
     def evaluate_answer(self, question: str, answer: str) -> dict:
         """
         Evaluate the provided answer based on multiple criteria and return the result as a JSON object.
@@ -43,17 +59,26 @@ class HREvaluationAgent:
         :param answer: The answer provided by the candidate
         :return: A dictionary containing scores for each criterion and the overall evaluation.
         """
-        prompt = self._generate_prompt(question, answer)
-
         response = self.client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "assistant", "content": prompt},
-            ],
-            response_format={"type": "json_object"},
+            **self._evaluation_request(question, answer)
+        )
+        return self._parse_evaluation(response.choices[0].message.content)
+
+    async def evaluate_answer_async(self, question: str, answer: str) -> dict:
+        """
+        Awaitable version of evaluate_answer that does not block the event loop.
+
+        :param question: HR-related question
+        :param answer: The answer provided by the candidate
+        :return: A dictionary containing scores for each criterion and the overall evaluation.
+        """
+        response = await self.async_client.chat.completions.create(
+            **self._evaluation_request(question, answer)
         )
-        evaluation_json = response.choices[0].message.content
+        return self._parse_evaluation(response.choices[0].message.content)
 
+    @staticmethod
+    def _parse_evaluation(evaluation_json: str) -> dict:
         try:
             parsed_json = json.loads(evaluation_json)
         except json.JSONDecodeError:
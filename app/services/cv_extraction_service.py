@@ -1,7 +1,15 @@
-from openai import OpenAI
-from pypdf import PdfReader
-import pdfplumber
+from openai import AsyncOpenAI, OpenAI
+from typing import List, Tuple, Union
+import asyncio
+import io
+import os
 import re
+from app.utils.executors import (
+    PDF_PARSE,
+    ExecutorSaturatedError,
+    WorkloadPools,
+    run_in_pool,
+)
 
 
 class CVProcessor:
@@ -9,6 +17,7 @@ class CVProcessor:
         # Load OpenAI API key from environment if not provided
         self.api_key = openai_api_key
         self.client = OpenAI(api_key=self.api_key)
+        self.async_client = AsyncOpenAI(api_key=self.api_key)
 
     @staticmethod
     def clean_text(text: str) -> str:
@@ -31,46 +40,167 @@ class CVProcessor:
         return text
 
     @staticmethod
-    def extract_text_from_cv(pdf_filename: str) -> str:
+    def _open_pdf(pdf_source: Union[str, bytes]):
+        # In-memory uploads are wrapped in a fresh buffer for every reader
+        if isinstance(pdf_source, (bytes, bytearray)):
+            return io.BytesIO(pdf_source)
+        return pdf_source
+
+    @staticmethod
+    def page_text_ok(text: str) -> bool:
+        """
+        Text-quality heuristic for the fast pypdf pass. Pages that fail it are
+        extracted again with pdfplumber.
+
+        A page fails when it has (almost) no text, undecoded glyphs ("(cid:12)"
+        or U+FFFD), mostly non-letters, or letters split into single-character
+        tokens by a broken layout ("J o h n  S m i t h").
+        """
+        stripped = text.strip() if text else ""
+        if len(stripped) < 20 or "(cid:" in stripped:
+            return False
+        visible = [char for char in stripped if not char.isspace()]
+        if sum(char.isalnum() for char in visible) < 0.6 * len(visible):
+            return False
+        if stripped.count("\ufffd") > 0.01 * len(visible):
+            return False
+        tokens = stripped.split()
+        return sum(len(token) == 1 for token in tokens) < 0.4 * len(tokens)
+
+    @staticmethod
+    def page_count(pdf_source: Union[str, bytes]) -> int:
+        from pypdf import PdfReader
+
+        return len(PdfReader(CVProcessor._open_pdf(pdf_source)).pages)
+
+    @staticmethod
+    def extract_pages(pdf_source: Union[str, bytes], start: int = 0, stop: int = None) -> List[str]:
+        """
+        Extracts the text of a range of pages, each page once.
+
+        Every page goes through pypdf first; only pages that fail
+        `page_text_ok` are extracted again with pdfplumber, whose result is
+        kept when it is not empty.
+
+        Args:
+            pdf_source (Union[str, bytes]): Path to the PDF file, or its content.
+            start (int): Index of the first page.
+            stop (int): Index after the last page; the end of the document when omitted.
+
+        Returns:
+            List[str]: The raw text of each page in the range.
+        """
+        return CVProcessor._extract_range(pdf_source, start, stop)[1]
+
+    @staticmethod
+    def _extract_range(
+        pdf_source: Union[str, bytes], start: int = 0, stop: int = None
+    ) -> Tuple[int, List[str]]:
+        """
+        `extract_pages` that also returns the number of pages of the document,
+        so the first range of a document needs no separate counting pass.
+        """
+        from pypdf import PdfReader
+
+        reader = PdfReader(CVProcessor._open_pdf(pdf_source))
+        count = len(reader.pages)
+        indices = range(count)[start:stop]
+        pages = [reader.pages[i].extract_text() or "" for i in indices]
+
+        retry = [n for n, text in enumerate(pages) if not CVProcessor.page_text_ok(text)]
+        if retry:
+            import pdfplumber
+
+            with pdfplumber.open(CVProcessor._open_pdf(pdf_source)) as pdf:
+                for n in retry:
+                    text = pdf.pages[indices[n]].extract_text()
+                    if text and text.strip():
+                        pages[n] = text
+        return count, pages
+
+    @staticmethod
+    def _join_pages(pages: List[str]) -> str:
+        # Join extracted text from all pages and clean it
+        return CVProcessor.clean_text("\n\n".join(page for page in pages if page))
+
+    @staticmethod
+    def extract_text_from_cv(pdf_source: Union[str, bytes]) -> str:
         """
         Extracts text from a PDF file.
 
         Args:
-            pdf_filename (str): Path to the PDF file.
+            pdf_source (Union[str, bytes]): Path to the PDF file, or its content.
 
         Returns:
             str: Cleaned and formatted text extracted from the PDF.
         """
         try:
-            # Use pdfplumber for more accurate text extraction
-            with pdfplumber.open(pdf_filename) as pdf:
-                pages = [
-                    page.extract_text() for page in pdf.pages if page.extract_text()
-                ]
+            return CVProcessor._join_pages(CVProcessor.extract_pages(pdf_source))
+        except Exception as e:
+            raise Exception(f"Error extracting text from PDF: {str(e)}")
 
-            if not pages:  # Fallback if pdfplumber fails
-                reader = PdfReader(pdf_filename)
-                pages = [page.extract_text() for page in reader.pages]
+    @staticmethod
+    async def extract_text_from_cv_async(
+        pdf_bytes: bytes, parallel_pages: int = None, parallel: bool = True
+    ) -> str:
+        """
+        Extracts text from an uploaded PDF in the PDF_PARSE pool.
 
-            # Join extracted text from all pages
-            raw_text = "\n\n".join(pages)
+        The first `parallel_pages` pages are extracted in one task, which also
+        counts the pages, so most CVs take a single task. The pages of longer
+        documents are split into ranges extracted in parallel, with no more
+        ranges than the pool has idle workers, so one large document does not
+        fill the pool's queue for everyone else.
 
-            # Clean the extracted text
-            cleaned_text = CVProcessor.clean_text(raw_text)
-            return cleaned_text
+        Args:
+            pdf_bytes (bytes): The content of the PDF file.
+            parallel_pages (int): Pages extracted before the rest is split
+                (PDF_PARALLEL_PAGES, 8 by default).
+            parallel (bool): False extracts the whole document in one task, for
+                callers that already run many documents at a time.
 
+        Returns:
+            str: Cleaned and formatted text extracted from the PDF.
+        """
+        if parallel_pages is None:
+            parallel_pages = int(os.getenv("PDF_PARALLEL_PAGES", 8))
+        try:
+            count, pages = await run_in_pool(
+                PDF_PARSE,
+                CVProcessor._extract_range,
+                pdf_bytes,
+                0,
+                parallel_pages if parallel else None,
+            )
+            if parallel and count > parallel_pages:
+                rest = count - parallel_pages
+                fan_out = max(1, min(WorkloadPools.get(PDF_PARSE).idle_workers, rest))
+                size = -(-rest // fan_out)
+                ranges = await asyncio.gather(
+                    *(
+                        run_in_pool(
+                            PDF_PARSE, CVProcessor.extract_pages, pdf_bytes, start, start + size
+                        )
+                        for start in range(parallel_pages, count, size)
+                    )
+                )
+                pages += [page for pages in ranges for page in pages]
+        except ExecutorSaturatedError:
+            raise
         except Exception as e:
             raise Exception(f"Error extracting text from PDF: {str(e)}")
+        return CVProcessor._join_pages(pages)
 
-    def segment_cv(self, pseudonymized_text: str) -> str:
+    @staticmethod
+    def _generate_segment_prompt(pseudonymized_text: str) -> str:
         """
-        Segments CV text into structured JSON format using OpenAI API.
+        Generates the prompt asking the model to segment a CV into JSON.
 
         Args:
             pseudonymized_text (str): Pseudonymized text of the CV.
 
         Returns:
-            str: Segmented JSON formatted text.
+            str: The prompt string to be sent to the model.
         """
         prompt = (
             """
@@ -112,11 +242,51 @@ class CVProcessor:
         """
             + pseudonymized_text
         )
+        return prompt
+
+    @staticmethod
+    def _segment_request(pseudonymized_text: str) -> dict:
+        # Shared by segment_cv and segment_cv_async
+        return {
+            "model": "gpt-4o",
+            "messages": [
+                {
+                    "role": "user",
+                    "content": CVProcessor._generate_segment_prompt(pseudonymized_text),
+                }
+            ],
+        }
+
+    @staticmethod
+    def _clean_segment_answer(answer: str) -> str:
+        return answer.replace("json", "").replace("```", "")
+
+    def segment_cv(self, pseudonymized_text: str) -> str:
+        """
+        Segments CV text into structured JSON format using OpenAI API.
 
+        Args:
+            pseudonymized_text (str): Pseudonymized text of the CV.
+
+        Returns:
+            str: Segmented JSON formatted text.
+        """
         completion = self.client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
+            **self._segment_request(pseudonymized_text)
+        )
+        return self._clean_segment_answer(completion.choices[0].message.content)
+
+    async def segment_cv_async(self, pseudonymized_text: str) -> str:
+        """
+        Awaitable version of segment_cv that does not block the event loop.
+
+        Args:
+            pseudonymized_text (str): Pseudonymized text of the CV.
+
+        Returns:
+            str: Segmented JSON formatted text.
+        """
+        completion = await self.async_client.chat.completions.create(
+            **self._segment_request(pseudonymized_text)
         )
-        answer = completion.choices[0].message.content
-        answer = answer.replace("json", "").replace("```", "")
-        return answer
+        return self._clean_segment_answer(completion.choices[0].message.content)
@@ -1,4 +1,4 @@
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 import json
 
 
@@ -10,6 +10,7 @@ class CVJobFitEvaluator:
         :param api_key: OpenAI API key for authentication
         """
         self.client = OpenAI(api_key=api_key)
+        self.async_client = AsyncOpenAI(api_key=api_key)
 
     def _generate_prompt(self, user_cv: str, job_description: str) -> str:
         """
@@ -42,6 +43,20 @@ class CVJobFitEvaluator:
         """
         return prompt
 
+    def _fit_request(self, user_cv: str, job_description: str) -> dict:
+        """
+        Build the completion request shared by evaluate_fit and evaluate_fit_async.
+        """
+        return {
+            "model": "gpt-4o",
+            "messages": [
+                {
+                    "role": "assistant",
+                    "content": self._generate_prompt(user_cv, job_description),
+                },
+            ],
+        }
+
     def evaluate_fit(self, user_cv: str, job_description: str) -> dict:
         """
         Evaluate the fit of the user's CV for the given job description and return a score from 1 to 10.
@@ -50,15 +65,26 @@ class CVJobFitEvaluator:
         :param job_description: The job description as a string
         :return: A dictionary containing the job fit score and detailed evaluation
         """
-        prompt = self._generate_prompt(user_cv, job_description)
-
         response = self.client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "assistant", "content": prompt},
-            ],
+            **self._fit_request(user_cv, job_description)
         )
-        evaluation_content = response.choices[0].message.content
+        return self._parse_score(response.choices[0].message.content)
+
+    async def evaluate_fit_async(self, user_cv: str, job_description: str) -> dict:
+        """
+        Awaitable version of evaluate_fit that does not block the event loop.
+
+        :param user_cv: The user's CV content as a string
+        :param job_description: The job description as a string
+        :return: A dictionary containing the job fit score and detailed evaluation
+        """
+        response = await self.async_client.chat.completions.create(
+            **self._fit_request(user_cv, job_description)
+        )
+        return self._parse_score(response.choices[0].message.content)
+
+    @staticmethod
+    def _parse_score(evaluation_content: str) -> dict:
         score = evaluation_content
 
         # Parse JSON response directly
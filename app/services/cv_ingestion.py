@@ -0,0 +1,244 @@
+import asyncio
+import functools
+import hashlib
+import io
+import json
+import logging
+import os
+import time
+import uuid
+import zipfile
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from app.services.cv_extraction_service import CVProcessor
+from app.services.pseudonymize import AnonymizationProcessor
+from app.utils.executors import INFERENCE, PDF_PARSE, WorkloadPools, run_in_pool
+
+logger = logging.getLogger(__name__)
+
+# Stages a CV goes through, in order
+PARSE = "parse"
+PSEUDONYMIZE = "pseudonymize"
+SEGMENT = "segment"
+STAGES = (PARSE, PSEUDONYMIZE, SEGMENT)
+
+
+def read_uploads(
+    files: List[Tuple[str, bytes]],
+    max_files: int = 1000,
+    max_file_bytes: int = 20 * 1024 * 1024,
+    max_bytes: int = 500 * 1024 * 1024,
+) -> List[Tuple[str, bytes]]:
+    """
+    Expand an upload of PDF files and zip archives into (file name, PDF bytes) pairs.
+
+    The limits are checked before each file is read, with the uncompressed
+    size of zip members, so an archive cannot expand beyond them in memory.
+
+    :param files: Uploaded (file name, content) pairs.
+    :param max_files: Maximum number of CVs accepted in one upload.
+    :param max_file_bytes: Maximum size of one CV.
+    :param max_bytes: Maximum size of all CVs together.
+    :return: The PDF files, zip members included.
+    """
+    cvs = []
+    total = 0
+
+    def accept(name: str, size: int):
+        nonlocal total
+        if len(cvs) >= max_files:
+            raise ValueError(f"Too many CVs in one upload (limit {max_files})")
+        if size > max_file_bytes:
+            raise ValueError(f"{name} is larger than {max_file_bytes} bytes")
+        total += size
+        if total > max_bytes:
+            raise ValueError(f"The CVs are larger than {max_bytes} bytes in total")
+
+    for filename, data in files:
+        if zipfile.is_zipfile(io.BytesIO(data)):
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                for member in archive.infolist():
+                    name = os.path.basename(member.filename)
+                    # Skip folders and the resource forks macOS adds to archives
+                    if member.is_dir() or name.startswith("."):
+                        continue
+                    if name.lower().endswith(".pdf") and "__MACOSX" not in member.filename:
+                        # file_size is enforced by zipfile while reading
+                        accept(name, member.file_size)
+                        cvs.append((name, archive.read(member)))
+        elif filename.lower().endswith(".pdf") or data.startswith(b"%PDF"):
+            accept(filename, len(data))
+            cvs.append((filename, data))
+    return cvs
+
+
+class IngestionJob:
+    def __init__(self, job_id: str, files: List[Tuple[str, bytes]]):
+        """
+        Progress and results of one bulk ingestion.
+
+        :param job_id: Identifier of the job.
+        :param files: The (file name, PDF bytes) pairs to ingest.
+        """
+        self.job_id = job_id
+        self.files = files
+        self.status = "queued"
+        self.created_at = time.time()
+        self.finished_at = None
+        self.error = None
+        # Number of CVs that are in or have passed each stage
+        self.started = {stage: 0 for stage in STAGES}
+        self.results = []
+
+    def progress(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "error": self.error,
+            "total": len(self.files),
+            "done": len(self.results),
+            "succeeded": sum(r["status"] == "done" for r in self.results),
+            "failed": sum(r["status"] == "failed" for r in self.results),
+            "stages": dict(self.started),
+            "elapsed": round((self.finished_at or time.time()) - self.created_at, 1),
+            "results": self.results,
+        }
+
+
+class CVIngestionPipeline:
+    def __init__(
+        self,
+        cv_processor: CVProcessor,
+        output_dir: str = "assets/candidates",
+        parse_concurrency: int = None,
+        ner_concurrency: int = None,
+        llm_concurrency: int = None,
+        max_jobs: int = 100,
+    ):
+        """
+        Bulk CV ingestion: parse, pseudonymise, segment and restore many CVs at once.
+
+        Every CV moves through the stages on its own, so the stages overlap
+        across CVs. Each stage has its own concurrency limit: parsing and NER
+        are CPU-bound and limited to their pools' sizes, segmentation waits on
+        the LLM API and can run many requests at a time. Each candidate's
+        result is written to <output_dir>/<job_id>/<candidate_id>.json.
+
+        :param cv_processor: The CV processor used for parsing and segmentation.
+        :param output_dir: Directory of the results.
+        :param parse_concurrency: CVs parsed at a time (CV_INGEST_PARSE_CONCURRENCY,
+            the PDF_PARSE pool size by default).
+        :param ner_concurrency: CVs pseudonymised at a time (CV_INGEST_NER_CONCURRENCY,
+            the INFERENCE pool size by default).
+        :param llm_concurrency: Segmentation requests in flight (CV_INGEST_LLM_CONCURRENCY, 8 by default).
+        :param max_jobs: Number of jobs whose progress is kept in memory.
+        """
+        self.cv_processor = cv_processor
+        self.output_dir = output_dir
+        self.parse_concurrency = parse_concurrency or os.getenv("CV_INGEST_PARSE_CONCURRENCY")
+        self.ner_concurrency = ner_concurrency or os.getenv("CV_INGEST_NER_CONCURRENCY")
+        self.llm_concurrency = llm_concurrency or os.getenv("CV_INGEST_LLM_CONCURRENCY", 8)
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._tasks = set()
+        self._limits = None
+
+    def start(self, files: List[Tuple[str, bytes]]) -> IngestionJob:
+        """
+        Start ingesting CVs in the background. Must be called from the event loop.
+
+        :param files: The (file name, PDF bytes) pairs to ingest.
+        :return: The job, whose progress can be polled with `get`.
+        """
+        if self._limits is None:
+            # Created on first use, so the pools exist and the semaphores belong to the running loop
+            self._limits = {
+                PARSE: asyncio.Semaphore(
+                    int(self.parse_concurrency or WorkloadPools.get(PDF_PARSE).max_workers)
+                ),
+                PSEUDONYMIZE: asyncio.Semaphore(
+                    int(self.ner_concurrency or WorkloadPools.get(INFERENCE).max_workers)
+                ),
+                SEGMENT: asyncio.Semaphore(int(self.llm_concurrency)),
+            }
+        job = IngestionJob(uuid.uuid4().hex, files)
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+
+        task = asyncio.create_task(self._run(job))
+        # Keep a reference so the task is not garbage collected while it runs
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        return self._jobs.get(job_id)
+
+    async def _run(self, job: IngestionJob):
+        job.status = "running"
+        try:
+            os.makedirs(os.path.join(self.output_dir, job.job_id), exist_ok=True)
+            await asyncio.gather(
+                *(self._ingest(job, filename, data) for filename, data in job.files)
+            )
+            job.status = "completed"
+        except Exception as e:
+            # Failures of single CVs are recorded by _ingest; this is the job itself failing
+            logger.exception("Ingestion job %s failed", job.job_id)
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            # The uploaded bytes are no longer needed once the job is over
+            job.files = [(filename, b"") for filename, _ in job.files]
+        logger.info(
+            "Ingestion job %s %s: %d CVs in %.1f s",
+            job.job_id,
+            job.status,
+            len(job.files),
+            job.finished_at - job.created_at,
+        )
+
+    async def _stage(self, job: IngestionJob, stage: str, coroutine_fn, *args):
+        async with self._limits[stage]:
+            job.started[stage] += 1
+            return await coroutine_fn(*args)
+
+    async def _ingest(self, job: IngestionJob, filename: str, data: bytes):
+        # Identical files are the same candidate
+        candidate_id = hashlib.sha256(data).hexdigest()[:16]
+        result = {"filename": filename, "candidate_id": candidate_id}
+        try:
+            # One task per CV: the CVs already run in parallel, and splitting
+            # each into page ranges would multiply the submissions to PDF_PARSE
+            text = await self._stage(
+                job,
+                PARSE,
+                functools.partial(CVProcessor.extract_text_from_cv_async, parallel=False),
+                data,
+            )
+
+            # Every candidate gets its own pseudonym map
+            anonymizer = AnonymizationProcessor()
+            pseudonymized_text = await self._stage(
+                job, PSEUDONYMIZE, run_in_pool, INFERENCE, anonymizer.anonymize_text, text
+            )
+
+            segmented_text = await self._stage(
+                job, SEGMENT, self.cv_processor.segment_cv_async, pseudonymized_text
+            )
+            output = json.loads(anonymizer.reverse_anonymization(segmented_text))
+
+            path = os.path.join(self.output_dir, job.job_id, f"{candidate_id}.json")
+            await asyncio.to_thread(self._write, path, output)
+            result.update(status="done", path=path)
+        except Exception as e:
+            logger.error("Ingestion of %s failed: %s", filename, str(e))
+            result.update(status="failed", error=str(e))
+        job.results.append(result)
+
+    @staticmethod
+    def _write(path: str, output: Dict):
+        with open(path, "w") as f:
+            json.dump(output, f)
@@ -1,6 +1,7 @@
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 from app.utils.pdf import generate_pdf_report, generate_short_report
 from app.utils.file_reader import get_hr_config
+from app.utils.executors import PDF_RENDER, run_in_pool
 import json
 
 
@@ -12,9 +13,22 @@ class HRReportGenerator:
         :param api_key: OpenAI API key for authentication
         """
         self.client = OpenAI(api_key=api_key)
+        self.async_client = AsyncOpenAI(api_key=api_key)
         self.config = get_hr_config()
         self.job_description = self.config["job_info"]
 
+    @staticmethod
+    def _request(prompt: str) -> dict:
+        """
+        Build the completion request for a prompt, shared by the sync and async reports.
+        """
+        return {
+            "model": "gpt-4o",
+            "messages": [
+                {"role": "assistant", "content": prompt},
+            ],
+        }
+
     def _generate_prompt(self, conversation: str, criteria: list[str]) -> str:
         """
         Generate the prompt for creating a human-readable evaluation report based on the interview conversation.
@@ -76,13 +90,8 @@ class HRReportGenerator:
         :param conversation: The interview conversation (questions and answers)
         :return: A formatted human-readable report as a string.
         """
-        prompt = self._generate_prompt(conversation, criteria=criteria)
-
         response = self.client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "assistant", "content": prompt},
-            ],
+            **self._request(self._generate_prompt(conversation, criteria=criteria))
         )
         report_content = response.choices[0].message.content
 
@@ -96,6 +105,24 @@ class HRReportGenerator:
 
         return report_content
 
+    async def generate_report_async(
+        self, conversation: str, file_path: str, criteria: list[str]
+    ) -> str:
+        """
+        Awaitable version of generate_report that does not block the event loop while waiting for the model.
+
+        :param conversation: The interview conversation (questions and answers)
+        :return: A formatted human-readable report as a string.
+        """
+        response = await self.async_client.chat.completions.create(
+            **self._request(self._generate_prompt(conversation, criteria=criteria))
+        )
+        report_content = response.choices[0].message.content
+
+        await run_in_pool(PDF_RENDER, generate_pdf_report, file_path, report_content)
+
+        return report_content
+
     def generate_criteria_scores(
         self, conversation: str, file_path: str, criteria: list[str]
     ) -> str:
@@ -107,6 +134,49 @@ class HRReportGenerator:
         :param criteria: List of evaluation criteria
         :return: A formatted JSON report as a string.
         """
+        response = self.client.chat.completions.create(
+            **self._request(self._generate_criteria_prompt(conversation, criteria))
+        )
+        report_json = self._parse_criteria_scores(response.choices[0].message.content)
+        generate_short_report(
+            scores_dic=report_json,
+            filename=file_path,
+            overall_assesment="",
+        )
+        return json.dumps(report_json, indent=4)
+
+    async def generate_criteria_scores_async(
+        self, conversation: str, file_path: str, criteria: list[str]
+    ) -> str:
+        """
+        Awaitable version of generate_criteria_scores that does not block the event loop while waiting for the model.
+
+        :param conversation: The interview conversation (questions and answers)
+        :param file_path: Path to save the evaluation report
+        :param criteria: List of evaluation criteria
+        :return: A formatted JSON report as a string.
+        """
+        response = await self.async_client.chat.completions.create(
+            **self._request(self._generate_criteria_prompt(conversation, criteria))
+        )
+        report_json = self._parse_criteria_scores(response.choices[0].message.content)
+        await run_in_pool(
+            PDF_RENDER,
+            generate_short_report,
+            scores_dic=report_json,
+            filename=file_path,
+            overall_assesment="",
+        )
+        return json.dumps(report_json, indent=4)
+
+    def _generate_criteria_prompt(self, conversation: str, criteria: list[str]) -> str:
+        """
+        Generate the prompt for scoring each answer of the conversation against the criteria.
+
+        :param conversation: The interview conversation (questions and answers)
+        :param criteria: List of evaluation criteria
+        :return: The prompt string to be sent to the model
+        """
         prompt = (
             "You are an expert evaluator for interviews. Based on the provided conversation, "
             "evaluate each question in the conversation against the given criteria and assign a score out of 100 for each criterion. "
@@ -131,32 +201,25 @@ class HRReportGenerator:
             "Criteria:\n"
             f"{', '.join(criteria)}\n"
         )
+        return prompt
 
-        response = self.client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "assistant", "content": prompt},
-            ],
-        )
+    def _parse_criteria_scores(self, content: str) -> dict:
+        """
+        Validate the JSON scores returned by the model.
+
+        :param content: Raw message content returned by the model
+        :return: The parsed scores.
+        """
         report_content = (
-            response.choices[0]
-            .message.content.strip()
+            content.strip()
             .replace("json", "")
             .replace("```", "")
         )
 
-        # Validate and save the JSON output
+        # Validate the JSON output
         try:
             # Convert the response to JSON for validation
-            report_json = json.loads(report_content)
-            # with open("assets/overall_assesment.txt", "w") as file:
-            #     overall_assesment = file.read()
-            generate_short_report(
-                scores_dic=report_json,
-                filename=file_path,
-                overall_assesment="",
-            )
-            return json.dumps(report_json, indent=4)
+            return json.loads(report_content)
 
         except json.JSONDecodeError as e:
             raise ValueError(
@@ -0,0 +1,126 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from dotenv import load_dotenv
+from app.services.pseudonymize import AnonymizationProcessor
+
+load_dotenv()
+
+
+class PseudonymStore:
+    def __init__(self, max_scopes: int = 1000, ttl: float = 3600, db_path: str = None):
+        """
+        Pseudonym maps kept per scope (an interview session or an API client's
+        own scope id) instead of one map shared by all traffic.
+
+        Scopes live in memory with an LRU cap and are evicted after `ttl`
+        seconds without use. With a database path, each scope's map is also
+        written in its compact form after every change and reloaded on demand,
+        so it survives eviction and restarts until the TTL has passed.
+
+        :param max_scopes: Maximum number of scopes kept in memory.
+        :param ttl: Seconds after which an unused scope is dropped.
+        :param db_path: SQLite file for persistence; None keeps maps in memory only.
+        """
+        self.max_scopes = max_scopes
+        self.ttl = ttl
+        self._scopes = OrderedDict()
+        self._last_access = {}
+        self._lock = threading.Lock()
+        self._conn = None
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pseudonym_maps (
+                    scope_id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+
+    def get(self, scope_id: str) -> AnonymizationProcessor:
+        """
+        Return the processor of a scope, creating (or reloading) it as needed.
+        """
+        with self._lock:
+            self._evict_expired()
+            processor = self._scopes.get(scope_id)
+            if processor is None:
+                processor = self._load(scope_id) or AnonymizationProcessor()
+                self._scopes[scope_id] = processor
+                while len(self._scopes) > self.max_scopes:
+                    evicted, _ = self._scopes.popitem(last=False)
+                    self._last_access.pop(evicted, None)
+            self._scopes.move_to_end(scope_id)
+            self._last_access[scope_id] = time.monotonic()
+        return processor
+
+    def save(self, scope_id: str):
+        """
+        Persist the current map of a scope; a no-op without a database.
+        """
+        if self._conn is None:
+            return
+        with self._lock:
+            processor = self._scopes.get(scope_id)
+            if processor is None:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pseudonym_maps VALUES (?, ?, ?)",
+                (scope_id, processor.to_compact(), time.time()),
+            )
+            self._conn.execute(
+                "DELETE FROM pseudonym_maps WHERE updated_at <= ?",
+                (time.time() - self.ttl,),
+            )
+            self._conn.commit()
+
+    def remove(self, scope_id: str):
+        with self._lock:
+            self._scopes.pop(scope_id, None)
+            self._last_access.pop(scope_id, None)
+            if self._conn is not None:
+                self._conn.execute(
+                    "DELETE FROM pseudonym_maps WHERE scope_id = ?", (scope_id,)
+                )
+                self._conn.commit()
+
+    def __len__(self) -> int:
+        return len(self._scopes)
+
+    def _load(self, scope_id: str) -> Optional[AnonymizationProcessor]:
+        if self._conn is None:
+            return None
+        row = self._conn.execute(
+            "SELECT data FROM pseudonym_maps WHERE scope_id = ? AND updated_at > ?",
+            (scope_id, time.time() - self.ttl),
+        ).fetchone()
+        if row is None:
+            return None
+        return AnonymizationProcessor.from_compact(None, row[0])
+
+    def _evict_expired(self):
+        # Scopes are ordered by last access, so expired ones are at the front
+        deadline = time.monotonic() - self.ttl
+        while self._scopes:
+            scope_id = next(iter(self._scopes))
+            if self._last_access[scope_id] > deadline:
+                break
+            self._scopes.popitem(last=False)
+            self._last_access.pop(scope_id)
+
+
+pseudonym_store = PseudonymStore(
+    max_scopes=int(os.getenv("PSEUDONYM_MAX_SCOPES", 1000)),
+    ttl=float(os.getenv("PSEUDONYM_SCOPE_TTL", 3600)),
+    db_path=os.getenv("PSEUDONYM_DB") or None,
+)
@@ -1,17 +1,306 @@
+import json
+import os
 import re
-from transformers import pipeline
+import threading
 import uuid
+from typing import Dict, Iterable, List, Tuple
+from dotenv import load_dotenv
+from app.utils.cache import TieredCache, content_key
+from app.utils.model_registry import ModelRegistry
+
+load_dotenv()
+
+
+NER_BACKENDS = ("torch", "onnx")
+
+# Entities found per normalised text, shared by every recognizer in the process.
+# The disk tier stores PII, so it is only used when NER_CACHE_DIR is set.
+ner_cache = TieredCache(
+    "ner",
+    memory_bytes=int(float(os.getenv("NER_CACHE_MEMORY_MB", 16)) * 1024 * 1024),
+    disk_dir=os.getenv("NER_CACHE_DIR") or None,
+    disk_bytes=int(float(os.getenv("NER_CACHE_DISK_MB", 256)) * 1024 * 1024),
+)
+
+
+def _torch_pipeline(model_name: str):
+    from transformers import pipeline
+
+    return pipeline("ner", model=model_name, aggregation_strategy="simple")
+
+
+def _onnx_pipeline(model_name: str, model_dir: str):
+    """
+    Build the NER pipeline on an int8 dynamically quantised ONNX export of the model.
+
+    The export and quantisation run once; later starts load the quantised
+    model from `model_dir`.
+    """
+    from optimum.onnxruntime import ORTModelForTokenClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer, pipeline
+
+    file_name = "model_quantized.onnx"
+    if not os.path.exists(os.path.join(model_dir, file_name)):
+        model = ORTModelForTokenClassification.from_pretrained(model_name, export=True)
+        quantizer = ORTQuantizer.from_pretrained(model)
+        quantizer.quantize(
+            save_dir=model_dir,
+            quantization_config=AutoQuantizationConfig.avx2(
+                is_static=False, per_channel=False
+            ),
+        )
+        model.config.save_pretrained(model_dir)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(model_dir)
+
+    model = ORTModelForTokenClassification.from_pretrained(model_dir, file_name=file_name)
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    return pipeline(
+        "ner", model=model, tokenizer=tokenizer, aggregation_strategy="simple"
+    )
+
+
+# PII with a fixed shape, found without the model
+PII_PATTERNS = {
+    "EMAIL": r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+",
+    "URL": r"(?:https?://|www\.)[^\s<>\"']*[^\s<>\"'.,;:!?)\]]",
+    # Not the tail of a longer digit group, as in "1 234 567 890"
+    "PHONE": r"(?<!\d[\s.-])(?:\+\d{1,3}[\s.-]?)?(?:\(\d{1,4}\)[\s.-]?)?\d{2,4}(?:[\s.-]?\d{2,4}){2,4}",
+}
+
+
+class RuleDetector:
+    def __init__(self, gazetteer: Dict[str, List[str]] = None):
+        """
+        Compiled regex and gazetteer detectors, run together in one pass over a text.
+
+        :param gazetteer: Known entities per type (e.g. {"ORG": ["acme"]}), matched as whole words.
+        """
+        self.gazetteer = {
+            name.lower(): entity_type
+            for entity_type, names in (gazetteer or {}).items()
+            for name in names
+        }
+        alternatives = [
+            f"(?P<{entity_type}>{pattern})" for entity_type, pattern in PII_PATTERNS.items()
+        ]
+        if self.gazetteer:
+            alternatives.append(f"(?P<GAZETTEER>{_trie_pattern(self.gazetteer)})")
+        # The boundaries apply to every alternative, not just the first and last
+        self.pattern = re.compile(rf"(?<![\w@+])(?:{'|'.join(alternatives)})(?![\w@])")
+        # Cached results are only valid for the rules that produced them
+        self.signature = content_key(self.pattern.pattern)
+
+    @classmethod
+    def from_file(cls, path: str = None) -> "RuleDetector":
+        """
+        Build a detector with the gazetteer in a JSON file of {type: [names]}, if one is given.
+        """
+        if not path:
+            return cls()
+        with open(path, "r") as f:
+            return cls(json.load(f))
+
+    def detect(self, text: str) -> Tuple[Dict[str, str], str]:
+        """
+        Find rule-based entities in a text.
+
+        :param text: The (lowercased) text to search.
+        :return: The entities with their types, and the text with the matches blanked out.
+        """
+        entities = {}
+
+        def blank(match) -> str:
+            entity, entity_type = match.group(), match.lastgroup
+            if entity_type == "GAZETTEER":
+                entity_type = self.gazetteer[entity]
+            elif entity_type == "PHONE" and not 9 <= sum(c.isdigit() for c in entity) <= 15:
+                # Dates, years and other short number runs are not phone numbers
+                return entity
+            entities.setdefault(entity, entity_type)
+            return " "
+
+        return entities, self.pattern.sub(blank, text)
 
 
 # Class for entity recognition using transformers
 class EntityRecognizer:
-    def __init__(self, model_name="dslim/bert-base-NER-uncased"):
-        self.ner_pipeline = pipeline(
-            "ner", model=model_name, aggregation_strategy="simple"
+    def __init__(
+        self,
+        model_name="dslim/bert-base-NER-uncased",
+        window_tokens: int = None,
+        overlap_tokens: int = None,
+        batch_size: int = None,
+        backend: str = None,
+        cache: TieredCache = ner_cache,
+        rules: RuleDetector = None,
+        min_letters: int = None,
+    ):
+        """
+        :param model_name: Hugging Face token classification model.
+        :param window_tokens: Tokens per chunk of long texts (NER_WINDOW_TOKENS, 256 by default).
+            Must stay below the model's 512 token limit.
+        :param overlap_tokens: Tokens shared by neighbouring chunks (NER_OVERLAP_TOKENS, 32 by default).
+        :param batch_size: Chunks per forward pass (NER_BATCH_SIZE, 8 by default).
+        :param backend: "torch" for the PyTorch pipeline or "onnx" for the int8 ONNX Runtime
+            model (NER_BACKEND, "torch" by default). The ONNX export is cached in NER_ONNX_DIR.
+        :param cache: Cache of entities per normalised text; None to always run the model.
+        :param rules: Detector for emails, phone numbers, URLs and gazetteer entries, run before
+            the model. Built with the gazetteer file in NER_GAZETTEER when omitted.
+        :param min_letters: Texts with fewer letters left after the rules skip the model
+            (NER_MIN_LETTERS, 3 by default; shorter entities are discarded anyway).
+        """
+        self.rules = rules or RuleDetector.from_file(os.getenv("NER_GAZETTEER"))
+        self.min_letters = (
+            min_letters if min_letters is not None else int(os.getenv("NER_MIN_LETTERS", 3))
+        )
+        self.model_name = model_name
+        self.cache = cache
+        self.backend = backend or os.getenv("NER_BACKEND", "torch")
+        if self.backend not in NER_BACKENDS:
+            raise ValueError(f"Unknown NER backend: {self.backend}")
+
+        # The backends import transformers/torch/onnxruntime only with the model
+        if self.backend == "onnx":
+            self.ner_pipeline = _onnx_pipeline(
+                model_name,
+                os.getenv("NER_ONNX_DIR")
+                or os.path.join("assets", "models", model_name.replace("/", "--") + "-int8"),
+            )
+        else:
+            self.ner_pipeline = _torch_pipeline(model_name)
+        self.window_tokens = window_tokens or int(os.getenv("NER_WINDOW_TOKENS", 256))
+        self.overlap_tokens = (
+            overlap_tokens
+            if overlap_tokens is not None
+            else int(os.getenv("NER_OVERLAP_TOKENS", 32))
+        )
+        if not 0 <= self.overlap_tokens < self.window_tokens // 2:
+            raise ValueError("NER overlap must be less than half the window")
+        self.batch_size = batch_size or int(os.getenv("NER_BATCH_SIZE", 8))
+
+    def _windows(self, text: str) -> List[Tuple[int, int, int, int]]:
+        """
+        Split a text into overlapping token windows.
+
+        :return: (start, end, own_start, own_end) character offsets of each
+            window. Every window owns the part of the text up to the middle of
+            its overlaps, so that each entity is reported by exactly one window.
+        """
+        offsets = self.ner_pipeline.tokenizer(
+            text, add_special_tokens=False, return_offsets_mapping=True
+        )["offset_mapping"]
+        if len(offsets) <= self.window_tokens:
+            return [(0, len(text), 0, len(text))]
+
+        step = self.window_tokens - self.overlap_tokens
+        firsts = list(range(0, len(offsets) - self.overlap_tokens, step))
+        # Neighbouring windows hand over in the middle of their overlap
+        handovers = [offsets[first + self.overlap_tokens // 2][0] for first in firsts[1:]]
+        own_starts = [0] + handovers
+        own_ends = handovers + [len(text)]
+        return [
+            (
+                offsets[first][0],
+                offsets[min(first + self.window_tokens, len(offsets)) - 1][1],
+                own_start,
+                own_end,
+            )
+            for first, own_start, own_end in zip(firsts, own_starts, own_ends)
+        ]
+
+    def find_entities(self, text: str) -> List[dict]:
+        """
+        Run the NER pipeline over the whole text, in batched overlapping windows if it is long.
+
+        :param text: The text to analyse.
+        :return: The pipeline's entity dictionaries with offsets into `text`.
+        """
+        windows = self._windows(text)
+        if len(windows) == 1:
+            return self.ner_pipeline(text)
+        return self.find_entities_batch([text])[0]
+
+    def find_entities_batch(self, texts: List[str]) -> List[List[dict]]:
+        """
+        Run the NER pipeline over several texts, with the windows of all texts in shared batches.
+
+        :param texts: The texts to analyse.
+        :return: For each text, the pipeline's entity dictionaries with offsets into it.
+        """
+        jobs = [
+            (index, window)
+            for index, text in enumerate(texts)
+            for window in self._windows(text)
+        ]
+        if not jobs:
+            return []
+        results = self.ner_pipeline(
+            [texts[index][start:end] for index, (start, end, _, _) in jobs],
+            batch_size=self.batch_size,
         )
 
+        entities = [[] for _ in texts]
+        for (index, (start, _, own_start, own_end)), chunk_entities in zip(jobs, results):
+            for entity in chunk_entities:
+                entity = dict(entity, start=entity["start"] + start, end=entity["end"] + start)
+                # Entities in an overlap are kept from the window that owns their start
+                if own_start <= entity["start"] < own_end:
+                    entities[index].append(entity)
+        return entities
+
+    def _cache_key(self, normalized: str) -> str:
+        return content_key(normalized, self.model_name, self.backend, self.rules.signature)
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        # Case and whitespace do not change what the uncased model finds
+        return " ".join(text.lower().split())
+
     def identify_entities(self, text):
-        entities = self.ner_pipeline(text.lower())
+        return self.identify_entities_batch([text])[0]
+
+    def identify_entities_batch(self, texts: List[str]) -> List[Dict[str, str]]:
+        """
+        Find the entities of several texts.
+
+        Cached texts are answered from the cache. For the others the rule
+        detectors run first; the model then sees only what they left, in
+        shared batches, and is skipped for texts with too few letters left.
+
+        :param texts: The texts to analyse.
+        :return: The entity dictionary of each text, in order.
+        """
+        normalized = [self._normalize(text) for text in texts]
+        results = [None] * len(texts)
+        if self.cache is not None:
+            for index, text in enumerate(normalized):
+                cached = self.cache.get(self._cache_key(text))
+                if cached is not None:
+                    results[index] = json.loads(cached)
+
+        misses = [index for index, result in enumerate(results) if result is None]
+        remaining = {}
+        for index in misses:
+            results[index], masked = self.rules.detect(normalized[index])
+            if sum(char.isalpha() for char in masked) >= self.min_letters:
+                remaining[index] = masked
+
+        found = self.find_entities_batch(list(remaining.values()))
+        for index, entities in zip(remaining, found):
+            for entity, entity_type in self._entity_dict(entities).items():
+                results[index].setdefault(entity, entity_type)
+
+        if self.cache is not None:
+            for index in misses:
+                self.cache.put(
+                    self._cache_key(normalized[index]),
+                    json.dumps(results[index]).encode("utf-8"),
+                )
+        return results
+
+    @staticmethod
+    def _entity_dict(entities: List[dict]) -> Dict[str, str]:
         entity_dict = {}
         for entity in entities:
             entity_text = entity["word"].lower()  # Extract the entity text
@@ -27,42 +316,158 @@ class EntityRecognizer:
         return entity_dict
 
 
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    Build a regex alternation of the words with shared prefixes factored out.
+
+    The regex engine then walks a prefix tree instead of trying every word at
+    every position, and optional suffixes are greedy so the longest word wins.
+    A space in a word matches any run of whitespace, so multi-word entities
+    are also found where a text breaks them across lines.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + build(child)
+            for char, child in node.items()
+            if char
+        ]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if "" in node:
+            return pattern + "?" if len(pattern) == 1 else f"(?:{pattern})?"
+        return pattern
+
+    return build(trie)
+
+
+class Substitution:
+    def __init__(self, mapping: Dict[str, str]):
+        """
+        Replace whole-word occurrences of many strings in one pass over a text.
+
+        :param mapping: Replacement of each string; longer strings win over their prefixes.
+            Whitespace in the strings matches any run of whitespace in the text.
+        """
+        self.mapping = {self._key(key): value for key, value in mapping.items()}
+        self.pattern = (
+            re.compile(rf"(?<!\w)(?:{_trie_pattern(self.mapping)})(?!\w)")
+            if self.mapping
+            else None
+        )
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return " ".join(text.split())
+
+    def apply(self, text: str) -> str:
+        if self.pattern is None:
+            return text
+        return self.pattern.sub(lambda match: self.mapping[self._key(match.group())], text)
+
+    def find(self, text: str) -> List[str]:
+        """
+        Return the mapped strings that occur in a text, in order of occurrence.
+        """
+        if self.pattern is None:
+            return []
+        return [self._key(match.group()) for match in self.pattern.finditer(text)]
+
+
 class AnonymizationProcessor:
-    def __init__(self, entity_recognizer: EntityRecognizer):
-        self.entity_recognizer = entity_recognizer
+    def __init__(self, entity_recognizer: EntityRecognizer = None):
+        """
+        :param entity_recognizer: Recognizer of the entities to replace; by default the shared
+            one from the ModelRegistry, resolved on first use, so creating a processor never
+            loads the model (e.g. on the event loop).
+        """
+        self._entity_recognizer = entity_recognizer
         self.entity_map = {}  # Store mappings for reversal
+        self.pseudonyms = {}  # The same mapping from entity to pseudonym
+        # Compiled substitutions, rebuilt when a new entity is added
+        self._forward = None
+        self._reverse = None
+        self._lock = threading.Lock()
 
-    def anonymize_text(self, text: str) -> str:
-        entities = self.entity_recognizer.identify_entities(text)
+    @property
+    def entity_recognizer(self) -> EntityRecognizer:
+        if self._entity_recognizer is None:
+            self._entity_recognizer = ModelRegistry.get_entity_recognizer()
+        return self._entity_recognizer
 
-        # Sort entities by length in descending order
-        sorted_entities = sorted(
-            entities.items(), key=lambda x: len(x[1]), reverse=True
-        )
+    @classmethod
+    def from_compact(cls, entity_recognizer: EntityRecognizer, data: str) -> "AnonymizationProcessor":
+        """
+        Restore a processor from the output of `to_compact`.
+        """
+        processor = cls(entity_recognizer)
+        processor.entity_map = json.loads(data)
+        processor.pseudonyms = {
+            entity: pseudonym for pseudonym, entity in processor.entity_map.items()
+        }
+        return processor
 
-        anonymized_text = text.lower()
-        for entity, entity_type in sorted_entities:
-            # If the entity has been anonymized already, use the same pseudonym
-            if entity not in self.entity_map.values():
-                pseudonym = self.generate_pseudonym(entity_type)
-                self.entity_map[pseudonym] = entity  # Store mapping for reversal
-            else:
-                pseudonym = [k for k, v in self.entity_map.items() if v == entity][0]
-
-            # Use regex to replace only whole words and avoid partial matches
-            anonymized_text = re.sub(
-                rf"\b{re.escape(entity)}\b", pseudonym, anonymized_text
-            )
-        return anonymized_text
+    def to_compact(self) -> str:
+        """
+        Serialise the pseudonym map as whitespace-free JSON of pseudonym to entity.
+        """
+        with self._lock:
+            return json.dumps(self.entity_map, separators=(",", ":"), ensure_ascii=False)
+
+    def pseudonym_for(self, entity: str, entity_type: str) -> str:
+        """
+        Return the pseudonym of an entity, creating one the first time it is seen.
+        """
+        pseudonym = self.pseudonyms.get(entity)
+        if pseudonym is None:
+            pseudonym = self.generate_pseudonym(entity_type)
+            self.pseudonyms[entity] = pseudonym
+            self.entity_map[pseudonym] = entity
+            self._forward = self._reverse = None
+        return pseudonym
+
+    def anonymize_text(self, text: str, entities: Dict[str, str] = None) -> str:
+        """
+        :param text: The text to pseudonymise.
+        :param entities: Entities found in the text beforehand (e.g. in a batch); detected when omitted.
+        """
+        if entities is None:
+            entities = self.entity_recognizer.identify_entities(text)
+        with self._lock:
+            for entity, entity_type in entities.items():
+                self.pseudonym_for(entity, entity_type)
+
+            # Every known entity is replaced, also where the recognizer missed it this time
+            if self._forward is None:
+                self._forward = Substitution(self.pseudonyms)
+            forward = self._forward
+        return forward.apply(text.lower())
+
+    def _reverse_substitution(self) -> Substitution:
+        with self._lock:
+            if self._reverse is None:
+                self._reverse = Substitution(self.entity_map)
+            return self._reverse
 
     def reverse_anonymization(self, anonymized_text: str) -> str:
-        original_text = anonymized_text.lower()
-        for pseudonym, entity in self.entity_map.items():
-            # Use regex to ensure full word match for replacement
-            original_text = re.sub(
-                rf"\b{re.escape(pseudonym)}\b", entity, original_text
-            )
-        return original_text
+        return self._reverse_substitution().apply(anonymized_text.lower())
+
+    def entries_in(self, anonymized_text: str) -> Dict[str, str]:
+        """
+        Return the part of the entity map whose pseudonyms occur in a text.
+        """
+        reverse = self._reverse_substitution()
+        return {
+            pseudonym: reverse.mapping[pseudonym]
+            for pseudonym in reverse.find(anonymized_text.lower())
+        }
 
     def generate_pseudonym(self, entity_type: str) -> str:
         """Generate more readable and relevant pseudonyms based on entity type"""
@@ -70,5 +475,10 @@ class AnonymizationProcessor:
             "PER": lambda: f"person_{uuid.uuid4().hex[:8]}",  # You can replace this with funny names
             "ORG": lambda: f"company_{uuid.uuid4().hex[:8]}",  # Add predefined company names if needed
             "LOC": lambda: f"location_{uuid.uuid4().hex[:8]}",  # Add predefined locations if needed
+            "EMAIL": lambda: f"email_{uuid.uuid4().hex[:8]}",
+            "PHONE": lambda: f"phone_{uuid.uuid4().hex[:8]}",
+            "URL": lambda: f"url_{uuid.uuid4().hex[:8]}",
         }
-        return pseudonym_map.get(entity_type, lambda: "unknown")()
+        # Other types (e.g. from a gazetteer) get a prefix of their own, so pseudonyms stay unique
+        prefix = re.sub(r"\W+", "_", entity_type.lower()).strip("_") or "entity"
+        return pseudonym_map.get(entity_type, lambda: f"{prefix}_{uuid.uuid4().hex[:8]}")()
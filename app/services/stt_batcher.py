@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import os
+from typing import List, Tuple
+import numpy as np
+from app.utils.executors import INFERENCE, run_in_pool
+from app.utils.model_registry import ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+# Whisper's 30 s window at 16 kHz; longer clips are not batched
+MAX_BATCH_SAMPLES = 30 * 16000
+
+
+class TranscriptionBatcher:
+    def __init__(self, stt=None, max_batch_size: int = 8, max_wait_ms: float = 10):
+        """
+        Micro-batching scheduler in front of the shared Whisper model.
+
+        Concurrent callers put their clips on a queue. A single worker takes the
+        first waiting clip, collects more for up to `max_wait_ms` or until
+        `max_batch_size` clips are queued, runs one batched forward pass and
+        hands every caller its own transcript.
+
+        :param stt: The STT model; by default the shared one from the ModelRegistry,
+            resolved in the inference pool so that loading it never blocks the event loop.
+        :param max_batch_size: Maximum number of clips decoded together.
+        :param max_wait_ms: How long the first clip of a batch waits for company.
+        """
+        self.stt = stt
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = None
+        self._worker = None
+        self.batches = 0
+        self.clips = 0
+
+    async def transcribe(self, audio: np.ndarray, language: str = None) -> dict:
+        """
+        Queue a clip for the next batch and wait for its transcript.
+        Clips longer than Whisper's 30 s window are transcribed on their own.
+
+        :param audio: 16 kHz mono float32 samples.
+        :param language: Language to decode in; detected when omitted.
+        :return: A dictionary with the transcript "text" and the "language" used.
+        """
+        if len(audio) > MAX_BATCH_SAMPLES:
+            # Long clips are decoded window by window and would hold up the batch
+            return await run_in_pool(INFERENCE, self._transcribe, audio, language)
+
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((audio, language, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[np.ndarray, str, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            audios = [audio for audio, _, _ in batch]
+            languages = [language for _, language, _ in batch]
+            try:
+                if len(audios) == 1:
+                    results = [
+                        await run_in_pool(
+                            INFERENCE, self._transcribe, audios[0], languages[0]
+                        )
+                    ]
+                else:
+                    results = await run_in_pool(
+                        INFERENCE, self._execute_batch, audios, languages
+                    )
+            except Exception as e:
+                logger.error("Batched transcription failed: %s", str(e))
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.clips += len(batch)
+            for (_, _, future), result in zip(batch, results):
+                # The caller may have gone away (e.g. client disconnected)
+                if not future.done():
+                    future.set_result(result)
+
+    def _model(self):
+        if self.stt is None:
+            self.stt = ModelRegistry.get_stt()
+        return self.stt
+
+    def _transcribe(self, audio: np.ndarray, language: str = None) -> dict:
+        return self._model().transcribe(audio, language)
+
+    def _execute_batch(self, audios: List[np.ndarray], languages: List[str]) -> List[dict]:
+        return self._model().execute_batch(audios, languages)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "clips": self.clips,
+            "mean_batch_size": round(self.clips / self.batches, 2) if self.batches else 0,
+        }
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+
+_batcher = None
+
+
+def get_transcription_batcher() -> TranscriptionBatcher:
+    """
+    Return the process-wide batcher, configured by STT_BATCH_MAX_SIZE and STT_BATCH_WAIT_MS.
+    """
+    global _batcher
+    if _batcher is None:
+        _batcher = TranscriptionBatcher(
+            max_batch_size=int(os.getenv("STT_BATCH_MAX_SIZE", 8)),
+            max_wait_ms=float(os.getenv("STT_BATCH_WAIT_MS", 10)),
+        )
+    return _batcher
@@ -0,0 +1,100 @@
+import asyncio
+import functools
+import logging
+import os
+from typing import Dict
+import numpy as np
+from app.utils.audio import SAMPLE_RATE
+from app.utils.executors import STT_PARALLEL, BoundedExecutor, WorkloadPools
+from app.utils.vad import split_at_silence
+from app.services.stt_batcher import get_transcription_batcher
+
+logger = logging.getLogger(__name__)
+
+# Whisper model of a pool worker process
+_worker_stt = None
+
+
+def _init_worker(threads: int):
+    """
+    Load a private Whisper model in a pool worker.
+    """
+    global _worker_stt
+    import torch
+    from app.services.stt_service import STT
+
+    # Workers share the cores, so each one gets only its slice of them
+    torch.set_num_threads(threads)
+    _worker_stt = STT()
+
+
+def _transcribe_chunk(audio: np.ndarray, language: str = None, profile: str = None) -> dict:
+    return _worker_stt.transcribe(audio, language, profile)
+
+
+def get_parallel_pool() -> BoundedExecutor:
+    """
+    Return the process pool used for chunked transcription, sized by STT_PARALLEL_WORKERS.
+    """
+    cpus = os.cpu_count() or 1
+    workers = int(os.getenv("STT_PARALLEL_WORKERS", max(1, cpus // 2)))
+    # Spawned workers do not inherit the torch thread pools of the server process
+    return WorkloadPools.get(
+        STT_PARALLEL,
+        initializer=functools.partial(_init_worker, max(1, cpus // max(1, workers))),
+        start_method="spawn",
+    )
+
+
+async def transcribe_parallel(
+    audio: np.ndarray,
+    language: str = None,
+    profile: str = None,
+    chunk_seconds: float = 30.0,
+) -> Dict[str, str]:
+    """
+    Transcribe a long recording by cutting it at pauses and decoding the chunks in parallel.
+
+    Each chunk is transcribed in a separate worker process with its own model,
+    and the texts are joined back in recording order.
+
+    :param audio: 16 kHz mono float32 samples.
+    :param language: Language to decode in; detected per chunk when omitted.
+    :param profile: Decode profile name; the worker default when omitted.
+    :param chunk_seconds: Maximum chunk length.
+    :return: A dictionary with the transcript "text" and the "language" of the first chunk.
+    """
+    chunks = split_at_silence(audio, max_seconds=chunk_seconds)
+    pool = get_parallel_pool()
+    results = await asyncio.gather(
+        *(
+            pool.run(_transcribe_chunk, audio[start:end], language, profile)
+            for start, end in chunks
+        )
+    )
+    logger.info(
+        "Transcribed %.1f s of audio in %d parallel chunks.",
+        len(audio) / SAMPLE_RATE,
+        len(chunks),
+    )
+    text = " ".join(r["text"].strip() for r in results if r["text"].strip())
+    detected = next((r["language"] for r in results if r["language"]), language)
+    return {"text": text, "language": detected}
+
+
+async def transcribe_audio(audio: np.ndarray, language: str = None) -> Dict[str, str]:
+    """
+    Transcribe a recording, splitting it across worker processes when it is long.
+
+    Recordings longer than STT_PARALLEL_MIN_SECONDS (60 s by default; 0 turns
+    parallel transcription off) are chunked, shorter ones go to the shared
+    model through the micro-batcher.
+
+    :param audio: 16 kHz mono float32 samples.
+    :param language: Language to decode in; detected when omitted.
+    :return: A dictionary with the transcript "text" and the "language" used.
+    """
+    min_seconds = float(os.getenv("STT_PARALLEL_MIN_SECONDS", 60))
+    if min_seconds > 0 and len(audio) > min_seconds * SAMPLE_RATE:
+        return await transcribe_parallel(audio, language)
+    return await get_transcription_batcher().transcribe(audio, language)
@@ -1,11 +1,189 @@
-import whisper
+import os
+from typing import Dict, List
+from app.utils.vad import trim_silence
+
+# Decoding settings selectable per call or with STT_PROFILE
+DECODE_PROFILES = {
+    # Greedy decoding with no temperature fallback or conditioning on earlier windows
+    "fast": {
+        "temperature": 0.0,
+        "beam_size": None,
+        "condition_on_previous_text": False,
+    },
+    # Whisper's own defaults, as the service originally decoded: greedy, with
+    # temperature fallback when a window looks degenerate
+    "default": {
+        "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        "beam_size": None,
+        "condition_on_previous_text": True,
+    },
+    # Opt-in beam search, falling back to sampling when a window looks degenerate
+    "accurate": {
+        "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        "beam_size": 5,
+        "condition_on_previous_text": True,
+    },
+}
+
+# Whisper's transcribe() defaults for temperature fallback and silence detection
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
 
 
 class STT:
     model = None
 
-    def __init__(self):
-        self.model = whisper.load_model("tiny")
+    def __init__(self, use_vad: bool = None, profile: str = None, quantize: str = None):
+        """
+        :param use_vad: Trim silence before transcription (STT_VAD, on by default).
+        :param profile: Default decode profile (STT_PROFILE, "default" by default).
+        :param quantize: "int8" for dynamic int8 quantisation of the CPU model (WHISPER_QUANTIZE).
+        """
+        # Imported here so that whisper/torch are only loaded with the model
+        import whisper
+
+        self.model = whisper.load_model(os.getenv("WHISPER_MODEL", "tiny"))
+
+        if quantize is None:
+            quantize = os.getenv("WHISPER_QUANTIZE", "none")
+        if quantize == "int8" and self.model.device.type == "cpu":
+            import torch
+
+            # Whisper builds its layers from its own nn.Linear subclass, which
+            # quantize_dynamic does not match (nor accept); the subclass only
+            # casts the weights to the input dtype, so plain nn.Linear is equivalent
+            for module in self.model.modules():
+                if isinstance(module, torch.nn.Linear):
+                    module.__class__ = torch.nn.Linear
+            # Linear layers dominate decoding cost and quantise with little accuracy loss
+            self.model = torch.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+
+        # Voice activity trimming can be turned off with STT_VAD=0
+        if use_vad is None:
+            use_vad = os.getenv("STT_VAD", "1") != "0"
+        self.use_vad = use_vad
+
+        self.profile = profile or os.getenv("STT_PROFILE", "default")
+        if self.profile not in DECODE_PROFILES:
+            raise ValueError(f"Unknown decode profile: {self.profile}")
+
+    @property
+    def _fp16(self) -> bool:
+        return self.model.device.type == "cuda"
+
+    def _prepare(self, audio):
+        """
+        Trim silence so the model only sees speech; empty if there is none.
+        """
+        if not self.use_vad:
+            return audio
+        return trim_silence(audio)
+
+    def transcribe(self, audio, language: str = None, profile: str = None) -> Dict[str, str]:
+        """
+        Transcribe one clip.
+
+        :param audio: 16 kHz mono float32 samples.
+        :param language: Language code to decode in; detected when omitted.
+        :param profile: Decode profile name; the instance default when omitted.
+        :return: A dictionary with the transcript "text" and the "language" used.
+        """
+        audio = self._prepare(audio)
+        if len(audio) == 0:
+            # Nothing was said, so there is nothing to transcribe
+            return {"text": "", "language": language}
+        return self._transcribe_speech(audio, language, profile)
+
+    def _transcribe_speech(self, audio, language: str = None, profile: str = None):
+        result = self.model.transcribe(
+            audio,
+            language=language,
+            fp16=self._fp16,
+            **DECODE_PROFILES[profile or self.profile],
+        )
+        # Stripped like the text of a batched decode, so both paths give the same transcript
+        return {"text": result["text"].strip(), "language": result.get("language", language)}
+
+    def execute(self, audio, language: str = None, profile: str = None) -> str:
+        return self.transcribe(audio, language, profile)["text"]
+
+    def execute_batch(
+        self, audios: List, languages: List[str] = None, profile: str = None
+    ) -> List[Dict[str, str]]:
+        """
+        Transcribe several clips with padded, batched forward passes.
+
+        Clips that fit in Whisper's 30 s window are padded to it, converted to
+        log-mel spectrograms and decoded together, one batch per requested
+        language, with the profile's first temperature and beam size. A clip
+        whose result fails Whisper's fallback checks is decoded again by
+        `transcribe` with the profile's full temperature fallback, and silence
+        is dropped as `transcribe` drops it, so a clip gets the same transcript
+        whether or not it was batched. Longer clips need the sliding-window
+        logic of `transcribe` and are handled one by one; callers should send
+        them there directly rather than hold up a batch.
+
+        :param audios: 16 kHz mono float32 clips.
+        :param languages: Language of each clip, None to detect it.
+        :param profile: Decode profile name; the instance default when omitted.
+        :return: A dictionary with "text" and "language" for each clip, in order.
+        """
+        import torch
+        import whisper
+
+        profile = profile or self.profile
+        settings = DECODE_PROFILES[profile]
+        temperatures = settings["temperature"]
+        if not isinstance(temperatures, (list, tuple)):
+            temperatures = (temperatures,)
+        languages = languages or [None] * len(audios)
+        results = [
+            {"text": "", "language": language} for language in languages
+        ]
+        groups = {}
+        for i, (audio, language) in enumerate(zip(audios, languages)):
+            audio = self._prepare(audio)
+            if len(audio) == 0:
+                continue
+            if len(audio) <= whisper.audio.N_SAMPLES:
+                groups.setdefault(language, []).append((i, audio))
+            else:
+                results[i] = self._transcribe_speech(audio, language, profile)
 
-    def execute(self, audio):
-        return self.model.transcribe(audio)["text"]
+        for language, group in groups.items():
+            mels = torch.stack(
+                [
+                    whisper.log_mel_spectrogram(
+                        whisper.pad_or_trim(torch.from_numpy(audio)),
+                        n_mels=self.model.dims.n_mels,
+                    )
+                    for _, audio in group
+                ]
+            ).to(self.model.device)
+            options = whisper.DecodingOptions(
+                language=language,
+                temperature=temperatures[0],
+                beam_size=settings["beam_size"],
+                fp16=self._fp16,
+                without_timestamps=True,
+            )
+            for (i, audio), decoded in zip(group, whisper.decode(self.model, mels, options)):
+                if (
+                    decoded.no_speech_prob > NO_SPEECH_THRESHOLD
+                    and decoded.avg_logprob <= LOGPROB_THRESHOLD
+                ):
+                    # transcribe skips such a window as silence
+                    results[i] = {"text": "", "language": decoded.language}
+                    continue
+                if len(temperatures) > 1 and (
+                    decoded.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+                    or decoded.avg_logprob < LOGPROB_THRESHOLD
+                ):
+                    # Degenerate output: retry with the fallback temperatures
+                    results[i] = self._transcribe_speech(audio, language, profile)
+                    continue
+                results[i] = {"text": decoded.text.strip(), "language": decoded.language}
+        return results
@@ -0,0 +1,110 @@
+import threading
+from typing import List
+import numpy as np
+from app.utils.audio import SAMPLE_RATE
+
+# Audio shorter than this is not worth a Whisper pass
+MIN_DECODE_SECONDS = 0.3
+
+
+class StreamingTranscriber:
+    def __init__(
+        self,
+        stt,
+        window_seconds: float = 15.0,
+        step_seconds: float = 1.0,
+        language: str = None,
+    ):
+        """
+        Incremental transcription of audio that arrives in chunks.
+
+        New audio is kept in a rolling window that is re-transcribed every
+        `step_seconds` of new audio to produce partial transcripts. Once the
+        window reaches `window_seconds` it is cut at its quietest point, the
+        part before the cut is transcribed one last time and committed, and
+        only the remainder is carried into the next window. Partial transcripts
+        use the "fast" decode profile since they are replaced moments later, and
+        the language detected in the first decode is pinned for the rest.
+
+        :param stt: The shared STT model.
+        :param window_seconds: Maximum length of audio decoded in one pass.
+        :param step_seconds: Amount of new audio that triggers a partial transcript.
+        :param language: Language of the speech; detected when omitted.
+        """
+        self.stt = stt
+        self.window = int(window_seconds * SAMPLE_RATE)
+        self.step = int(step_seconds * SAMPLE_RATE)
+        self._committed: List[str] = []
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.language = language
+
+    def add_audio(self, samples: np.ndarray):
+        with self._lock:
+            self._buffer = np.concatenate([self._buffer, samples])
+            self._pending += len(samples)
+
+    def ready_for_partial(self) -> bool:
+        return self._pending >= self.step
+
+    def transcribe_partial(self) -> str:
+        """
+        Transcribe the current window and return the transcript so far.
+        Calls must not overlap; this runs a blocking Whisper pass.
+        """
+        with self._lock:
+            self._pending = 0
+        self._commit_full_windows()
+        with self._lock:
+            tail = self._buffer.copy()
+        return self._join(self._decode(tail, profile="fast"))
+
+    def finish(self) -> str:
+        """
+        Transcribe whatever audio is left and return the final transcript.
+        """
+        self._commit_full_windows()
+        with self._lock:
+            tail, self._buffer = self._buffer, np.zeros(0, dtype=np.float32)
+            self._pending = 0
+        self._committed.append(self._decode(tail))
+        return self._join("")
+
+    def _commit_full_windows(self):
+        # Audio may have piled up while a previous decode was running
+        while True:
+            with self._lock:
+                if len(self._buffer) < self.window:
+                    return
+                cut = self._quiet_cut(self._buffer[: self.window])
+                head, self._buffer = self._buffer[:cut], self._buffer[cut:]
+            self._committed.append(self._decode(head))
+
+    def _decode(self, audio: np.ndarray, profile: str = None) -> str:
+        if len(audio) < MIN_DECODE_SECONDS * SAMPLE_RATE:
+            return ""
+        result = self.stt.transcribe(audio, language=self.language, profile=profile)
+        if self.language is None and result["text"].strip():
+            self.language = result["language"]
+        return result["text"].strip()
+
+    def _join(self, tail_text: str) -> str:
+        return " ".join(text for text in self._committed + [tail_text] if text)
+
+    @staticmethod
+    def _quiet_cut(audio: np.ndarray, search_seconds: float = 3.0) -> int:
+        """
+        Index of the quietest 30 ms frame in the last seconds of the window, so
+        that words are not split between two windows. The cut is never in the
+        first half of the window, so every cut makes progress.
+        """
+        frame = int(0.03 * SAMPLE_RATE)
+        start = max(len(audio) // 2, len(audio) - int(search_seconds * SAMPLE_RATE))
+        frames = len(audio[start:]) // frame
+        if frames == 0:
+            return len(audio)
+        energy = np.square(audio[start : start + frames * frame]).reshape(
+            frames, frame
+        ).mean(axis=1)
+        return start + int(np.argmin(energy)) * frame
@@ -0,0 +1,158 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+START = "start"
+QUESTION = "question"
+ANSWER = "answer"
+
+
+class TranscriptStore:
+    def __init__(self, db_path: str = "logs/transcripts.db"):
+        """
+        Append-only store of interview turns, indexed by session and turn number.
+
+        Each turn is a row (session_id, turn, role, text). Restarting an interview
+        appends a new "start" marker instead of deleting rows, and reads only
+        return the turns after the latest marker. The turns of one call are
+        written in a single transaction, and the database runs in WAL mode with
+        synchronous=NORMAL, so commits are appends to the log and fsync is
+        batched at checkpoints.
+
+        The database is opened on first use, so importing this module creates
+        no files. The methods block on SQLite; call them from a worker thread
+        (e.g. asyncio.to_thread) inside async handlers.
+
+        :param db_path: Path of the SQLite database file.
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # Called with the lock held
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS turns (
+                    session_id TEXT NOT NULL,
+                    turn INTEGER NOT NULL,
+                    role TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (session_id, turn)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _append(self, session_id: str, *turns: Tuple[str, str]) -> int:
+        """
+        Append (role, text) turns to a session in one transaction.
+
+        :return: The number of the last appended turn.
+        """
+        with self._lock:
+            conn = self._connection()
+            (turn,) = conn.execute(
+                "SELECT COALESCE(MAX(turn), -1) FROM turns WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            now = time.time()
+            rows = []
+            for role, text in turns:
+                turn += 1
+                rows.append((session_id, turn, role, text, now))
+            conn.executemany("INSERT INTO turns VALUES (?, ?, ?, ?, ?)", rows)
+            conn.commit()
+        return turn
+
+    def start_conversation(self, session_id: str, question: str):
+        """
+        Begin a new conversation for the session with its first question.
+        """
+        self._append(session_id, (START, ""), (QUESTION, question))
+
+    def add_answer(self, session_id: str, answer: str, next_question: str = None):
+        """
+        Record the candidate's answer and, if any, the question asked next.
+        """
+        turns = [(ANSWER, answer)]
+        if next_question:
+            turns.append((QUESTION, next_question))
+        self._append(session_id, *turns)
+
+    def add_question(self, session_id: str, question: str):
+        """
+        Record a question asked after the last answer, when it was not known at that time.
+        """
+        self._append(session_id, (QUESTION, question))
+
+    def get_turns(self, session_id: str) -> List[Dict]:
+        """
+        Return the turns of the session's latest conversation in order.
+        """
+        with self._lock:
+            rows = self._connection().execute(
+                """
+                SELECT turn, role, text, created_at FROM turns
+                WHERE session_id = ?
+                  AND turn > (
+                      SELECT COALESCE(MAX(turn), -1) FROM turns
+                      WHERE session_id = ? AND role = ?
+                  )
+                ORDER BY turn
+                """,
+                (session_id, session_id, START),
+            ).fetchall()
+        return [
+            {"turn": turn, "role": role, "text": text, "created_at": created_at}
+            for turn, role, text, created_at in rows
+        ]
+
+    def get_qa_pairs(self, session_id: str) -> List[Dict[str, str]]:
+        """
+        Return the session's questions with the answers given to them.
+        Unanswered questions have an answer of None.
+        """
+        pairs = []
+        for row in self.get_turns(session_id):
+            if row["role"] == QUESTION:
+                pairs.append({"question": row["text"], "answer": None})
+            elif row["role"] == ANSWER and pairs:
+                pairs[-1]["answer"] = row["text"]
+        return pairs
+
+    def render_conversation(self, session_id: str) -> str:
+        """
+        Render the session's conversation as the plain text transcript used in report prompts.
+        """
+        pairs = self.get_qa_pairs(session_id)
+        if not pairs:
+            return ""
+        lines = ["**Start of Conversation**\n"]
+        for pair in pairs:
+            lines.append(f"Question: {pair['question']}")
+            if pair["answer"] is not None:
+                lines.append(f"Answer: {pair['answer']}\n")
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+transcript_store = TranscriptStore(os.getenv("TRANSCRIPT_DB", "logs/transcripts.db"))
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import os
+from typing import AsyncIterator, Dict, Iterable, Optional
+from app.services.tts_service import TextToSpeechService
+
+logger = logging.getLogger(__name__)
+
+
+class AudioPrefetcher:
+    def __init__(self, tts_service: TextToSpeechService, max_concurrency: int = 4):
+        """
+        Synthesise question audio in the background before it is needed.
+
+        Prefetched audio lands in the TTS cache. A request for a text that is
+        still being synthesised waits for that synthesis instead of starting
+        a second one.
+
+        :param tts_service: The TTS service whose cache is filled.
+        :param max_concurrency: Maximum number of background syntheses at a time.
+        """
+        self.tts_service = tts_service
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.prefetched = 0
+        self.joined = 0
+
+    def prefetch(self, texts: Iterable[str]):
+        """
+        Start background synthesis of the texts that are not cached or in flight yet.
+        Must be called from the event loop; returns immediately.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        cache = self.tts_service.cache
+        for text in texts:
+            if not text or not text.strip():
+                continue
+            key = self.tts_service.cache_key(text)
+            # An index lookup only; a miss is settled by the disk tier in _synthesise
+            if key in self._in_flight or (cache is not None and key in cache):
+                continue
+            task = asyncio.create_task(self._synthesise(text))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _, key=key: self._in_flight.pop(key, None))
+
+    async def _synthesise(self, text: str) -> Optional[bytes]:
+        try:
+            async with self._semaphore:
+                audio_content = await self.tts_service.get_sound_of_text_async(text)
+        except Exception as e:
+            # A failed prefetch only costs the latency it was meant to save
+            logger.warning("Audio prefetch failed: %s", str(e))
+            return None
+        self.prefetched += 1
+        return audio_content
+
+    async def get(self, text: str) -> bytes:
+        """
+        Return the audio of a text, joining a prefetch in flight if there is one.
+        """
+        task = self._in_flight.get(self.tts_service.cache_key(text))
+        if task is not None:
+            # Shielded so that a cancelled request does not cancel the prefetch
+            audio_content = await asyncio.shield(task)
+            if audio_content is not None:
+                self.joined += 1
+                return audio_content
+        return await self.tts_service.get_sound_of_text_async(text)
+
+    async def stream(self, text: str) -> AsyncIterator[bytes]:
+        """
+        Yield the audio of a text, from a prefetch in flight or streamed from the API.
+        """
+        task = self._in_flight.get(self.tts_service.cache_key(text))
+        if task is not None:
+            audio_content = await asyncio.shield(task)
+            if audio_content is not None:
+                self.joined += 1
+                yield audio_content
+                return
+        async for chunk in self.tts_service.stream_sound_of_text(text):
+            yield chunk
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._in_flight),
+            "prefetched": self.prefetched,
+            "joined": self.joined,
+        }
+
+
+audio_prefetcher = AudioPrefetcher(
+    TextToSpeechService(),
+    max_concurrency=int(os.getenv("TTS_PREFETCH_CONCURRENCY", 4)),
+)
@@ -1,14 +1,40 @@
+import asyncio
 import os
+from typing import AsyncIterator
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+from app.utils.cache import TieredCache, content_key
+
+load_dotenv()
+
+# Synthesised audio shared by every TTS service instance, keyed by (text, model, voice).
+# The disk directory is only created when the first audio is stored.
+tts_cache = TieredCache(
+    "tts",
+    memory_bytes=int(float(os.getenv("TTS_CACHE_MEMORY_MB", 64)) * 1024 * 1024),
+    disk_dir=os.getenv("TTS_CACHE_DIR", "assets/tts_cache") or None,
+    disk_bytes=int(float(os.getenv("TTS_CACHE_DISK_MB", 512)) * 1024 * 1024),
+)
 
 
 class TextToSpeechService:
-    def __init__(self):
+    def __init__(self, model: str = "tts-1", voice: str = "onyx", cache: TieredCache = tts_cache):
+        """
+        :param model: OpenAI TTS model.
+        :param voice: OpenAI TTS voice.
+        :param cache: Cache of synthesised audio; None to always call the API.
+        """
         # Load environment variables
         load_dotenv()
         # Initialize OpenAI client with API key from environment variables
         self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.model = model
+        self.voice = voice
+        self.cache = cache
+
+    def cache_key(self, text: str) -> str:
+        return content_key(text, self.model, self.voice)
 
     def get_sound_of_text(self, text: str) -> bytes:
         """
@@ -16,8 +42,114 @@ class TextToSpeechService:
         :param text: The text to convert to speech.
         :return: The audio content in bytes.
         """
+        if self.cache is not None:
+            audio_content = self.cache.get(self.cache_key(text))
+            if audio_content is not None:
+                return audio_content
+
         response = self.client.audio.speech.create(
-            model="tts-1", voice="onyx", input=text
+            model=self.model, voice=self.voice, input=text
         )
         audio_content = response.read()
+        if self.cache is not None:
+            self.cache.put(self.cache_key(text), audio_content)
+        return audio_content
+
+    async def get_sound_of_text_async(self, text: str, use_cache: bool = True) -> bytes:
+        """
+        Awaitable version of get_sound_of_text that does not block the event loop.
+        :param text: The text to convert to speech.
+        :param use_cache: Look the audio up in and store it to the cache.
+        :return: The audio content in bytes.
+        """
+        use_cache = use_cache and self.cache is not None
+        if use_cache:
+            audio_content = await self.cache.aget(self.cache_key(text))
+            if audio_content is not None:
+                return audio_content
+
+        response = await self.async_client.audio.speech.create(
+            model=self.model, voice=self.voice, input=text
+        )
+        audio_content = await response.aread()
+        if use_cache:
+            await self.cache.aput(self.cache_key(text), audio_content)
         return audio_content
+
+    async def stream_sound_of_text(
+        self, text: str, chunk_size: int = 4096
+    ) -> AsyncIterator[bytes]:
+        """
+        Yield the audio of a text as it arrives from the API, so playback can start early.
+        The complete audio is cached once the stream has finished.
+        :param text: The text to convert to speech.
+        :param chunk_size: Size of the yielded chunks in bytes.
+        :return: An async iterator over the audio bytes.
+        """
+        if self.cache is not None:
+            audio_content = await self.cache.aget(self.cache_key(text))
+            if audio_content is not None:
+                yield audio_content
+                return
+
+        chunks = []
+        async with self.async_client.audio.speech.with_streaming_response.create(
+            model=self.model, voice=self.voice, input=text
+        ) as response:
+            async for chunk in response.iter_bytes(chunk_size):
+                chunks.append(chunk)
+                yield chunk
+        if self.cache is not None:
+            await self.cache.aput(self.cache_key(text), b"".join(chunks))
+
+    async def stream_sentences(
+        self, sentences: AsyncIterator[str], use_cache: bool = False
+    ) -> AsyncIterator[bytes]:
+        """
+        Synthesise sentences as they arrive and yield their audio in order.
+
+        Each sentence is sent to the API as soon as it is received, so the
+        first one can play while later ones are still being generated and
+        synthesised. MP3 segments can be concatenated, so the output is one
+        playable stream.
+        :param sentences: Async iterator over the sentences to speak.
+        :param use_cache: Cache the audio of each sentence. Off by default: generated
+            sentences are spoken once and would evict the pre-rendered questions.
+        :return: An async iterator over the audio of each sentence.
+        """
+        queue = asyncio.Queue()
+
+        async def synthesise_all():
+            try:
+                async for sentence in sentences:
+                    await queue.put(
+                        asyncio.create_task(
+                            self.get_sound_of_text_async(sentence, use_cache)
+                        )
+                    )
+            finally:
+                await queue.put(None)
+
+        producer = asyncio.create_task(synthesise_all())
+        try:
+            while True:
+                task = await queue.get()
+                if task is None:
+                    break
+                yield await task
+            # Re-raise a failure of the text stream
+            await producer
+        finally:
+            producer.cancel()
+            # The consumer stopped early: drop the syntheses nobody will hear
+            while not queue.empty():
+                task = queue.get_nowait()
+                if task is not None:
+                    task.cancel()
+
+    def invalidate(self, text: str):
+        """
+        Drop the cached audio of a text so that the next request synthesises it again.
+        """
+        if self.cache is not None:
+            self.cache.invalidate(self.cache_key(text))
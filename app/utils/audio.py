@@ -0,0 +1,68 @@
+import io
+import subprocess
+import numpy as np
+
+# Whisper expects 16 kHz mono audio
+SAMPLE_RATE = 16000
+
+
+def _decode_with_ffmpeg(audio_bytes: bytes, sr: int) -> np.ndarray:
+    """
+    Decode any container ffmpeg understands (webm, ogg, mp3, ...) through pipes.
+    """
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-threads",
+        "0",
+        "-i",
+        "pipe:0",
+        "-f",
+        "s16le",
+        "-ac",
+        "1",
+        "-acodec",
+        "pcm_s16le",
+        "-ar",
+        str(sr),
+        "pipe:1",
+    ]
+    try:
+        out = subprocess.run(cmd, input=audio_bytes, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise ValueError(f"Failed to decode audio: {e.stderr.decode(errors='ignore')}")
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+def decode_audio(audio_bytes: bytes, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode an uploaded audio file to a mono float32 array without touching the disk.
+
+    :param audio_bytes: The raw bytes of the uploaded file.
+    :param sr: Target sampling rate.
+    :return: The decoded samples in [-1, 1] at the target sampling rate.
+    """
+    import soundfile as sf
+
+    try:
+        audio, file_sr = sf.read(io.BytesIO(audio_bytes), dtype="float32", always_2d=True)
+    except (RuntimeError, sf.LibsndfileError):
+        # Not a format libsndfile can read (e.g. webm from the browser)
+        return _decode_with_ffmpeg(audio_bytes, sr)
+
+    audio = audio.mean(axis=1)
+    if file_sr != sr:
+        import librosa
+
+        audio = librosa.resample(audio, orig_sr=file_sr, target_sr=sr)
+    return np.ascontiguousarray(audio, dtype=np.float32)
+
+
+def pcm16_to_float32(data: bytes) -> np.ndarray:
+    """
+    Convert raw 16-bit little-endian mono PCM to float32 samples in [-1, 1].
+
+    :param data: PCM bytes; must contain a whole number of samples.
+    :return: The samples as float32.
+    """
+    return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
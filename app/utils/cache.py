@@ -0,0 +1,256 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def content_key(*parts: str) -> str:
+    """
+    Hash the parts that determine a cached value into a file-name safe key.
+    """
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+class TieredCache:
+    """
+    Byte-value cache with an in-memory tier in front of an on-disk tier.
+
+    Both tiers are LRU ordered and capped by total size in bytes. A disk hit
+    is promoted to memory; values evicted from memory stay on disk. Disk
+    entries are files named after their key, so the disk tier survives
+    restarts and can be shared by worker processes.
+
+    The disk directory is created and indexed on first use, not on
+    construction. Files are read and written outside the lock, so a memory
+    lookup never waits on disk I/O; async callers use `aget` and `aput`,
+    which move the disk tier to a worker thread.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        memory_bytes: int = 64 * 1024 * 1024,
+        disk_dir: str = None,
+        disk_bytes: int = 512 * 1024 * 1024,
+    ):
+        """
+        :param name: Name used in logs and stats.
+        :param memory_bytes: Size cap of the in-memory tier; 0 disables it.
+        :param disk_dir: Directory of the on-disk tier; None disables it.
+        :param disk_bytes: Size cap of the on-disk tier.
+        """
+        self.name = name
+        self.memory_bytes = memory_bytes
+        self.disk_dir = disk_dir
+        self.disk_bytes = disk_bytes
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._disk = OrderedDict()
+        self._disk_size = 0
+        self._disk_loaded = not disk_dir
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.bin")
+
+    def _load_disk(self):
+        """
+        Create the disk directory and rebuild the LRU order of the disk tier
+        from access times, once.
+        """
+        if self._disk_loaded:
+            return
+        with self._load_lock:
+            if self._disk_loaded:
+                return
+            os.makedirs(self.disk_dir, exist_ok=True)
+            entries = []
+            for entry in os.scandir(self.disk_dir):
+                if entry.is_file() and entry.name.endswith(".bin"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+            with self._lock:
+                for _, key, size in sorted(entries):
+                    if key not in self._disk:
+                        self._disk[key] = size
+                        self._disk_size += size
+                evicted = self._evict_disk()
+                self._disk_loaded = True
+            self._remove_files(evicted)
+
+    def _get_memory(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+            return value
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Return the cached value for a key, or None on a miss.
+        """
+        value = self._get_memory(key)
+        if value is not None:
+            return value
+        return self._get_disk(key)
+
+    async def aget(self, key: str) -> Optional[bytes]:
+        """
+        `get` for the event loop: memory hits are answered directly, the disk
+        tier is read in a worker thread.
+        """
+        value = self._get_memory(key)
+        if value is not None:
+            return value
+        if self.disk_dir is None:
+            return self._get_disk(key)
+        return await asyncio.to_thread(self._get_disk, key)
+
+    def _get_disk(self, key: str) -> Optional[bytes]:
+        self._load_disk()
+        with self._lock:
+            on_disk = key in self._disk
+        if on_disk:
+            path = self._path(key)
+            try:
+                with open(path, "rb") as file:
+                    value = file.read()
+                os.utime(path)
+            except OSError:
+                # Removed behind our back (e.g. by another process)
+                with self._lock:
+                    self._disk_size -= self._disk.pop(key, 0)
+            else:
+                with self._lock:
+                    if key in self._disk:
+                        self._disk.move_to_end(key)
+                    self.disk_hits += 1
+                    self._put_memory(key, value)
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def __contains__(self, key: str) -> bool:
+        # Membership checks do not count as lookups or refresh the LRU order.
+        # They never touch the disk: before the disk tier is indexed, its
+        # entries count as absent.
+        with self._lock:
+            return key in self._memory or key in self._disk
+
+    def put(self, key: str, value: bytes):
+        """
+        Store a value in both tiers, evicting the least recently used entries as needed.
+        """
+        with self._lock:
+            self._put_memory(key, value)
+        if self.disk_dir and len(value) <= self.disk_bytes:
+            self._put_disk(key, value)
+
+    async def aput(self, key: str, value: bytes):
+        """
+        `put` for the event loop: the disk tier is written in a worker thread.
+        """
+        with self._lock:
+            self._put_memory(key, value)
+        if self.disk_dir and len(value) <= self.disk_bytes:
+            await asyncio.to_thread(self._put_disk, key, value)
+
+    def _put_disk(self, key: str, value: bytes):
+        self._load_disk()
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as file:
+                file.write(value)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Cache '%s' could not write %s: %s", self.name, path, e)
+            return
+        with self._lock:
+            self._disk_size += len(value) - self._disk.pop(key, 0)
+            self._disk[key] = len(value)
+            evicted = self._evict_disk()
+        self._remove_files(evicted)
+
+    def invalidate(self, key: str):
+        """
+        Remove a key from both tiers.
+        """
+        self._load_disk()
+        with self._lock:
+            value = self._memory.pop(key, None)
+            if value is not None:
+                self._memory_size -= len(value)
+            removed = key in self._disk
+            if removed:
+                self._disk_size -= self._disk.pop(key)
+        if removed:
+            self._remove_files([key])
+
+    def clear(self):
+        """
+        Remove every entry from both tiers.
+        """
+        self._load_disk()
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+            removed = list(self._disk)
+            self._disk.clear()
+            self._disk_size = 0
+        self._remove_files(removed)
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_size,
+            "disk_entries": len(self._disk),
+            "disk_bytes": self._disk_size,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3)
+            if lookups
+            else 0.0,
+        }
+
+    def _put_memory(self, key: str, value: bytes):
+        if len(value) > self.memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= len(previous)
+        self._memory[key] = value
+        self._memory_size += len(value)
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+
+    def _evict_disk(self) -> list:
+        # Called with the lock held; the caller removes the files after releasing it
+        evicted = []
+        while self._disk_size > self.disk_bytes:
+            key, size = self._disk.popitem(last=False)
+            self._disk_size -= size
+            evicted.append(key)
+        return evicted
+
+    def _remove_files(self, keys):
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
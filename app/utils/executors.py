@@ -0,0 +1,217 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+# Workload classes, each served by its own pool
+INFERENCE = "inference"
+PDF_PARSE = "pdf_parse"
+PDF_RENDER = "pdf_render"
+STT_PARALLEL = "stt_parallel"
+
+
+class ExecutorSaturatedError(Exception):
+    """Raised when a pool's queue stays full for longer than its queue timeout."""
+
+
+def _default_workers(name: str) -> int:
+    cpus = os.cpu_count() or 1
+    if name == INFERENCE:
+        # Torch already parallelises a single forward pass across cores
+        return max(1, cpus // 4)
+    return max(1, cpus // 2)
+
+
+class BoundedExecutor:
+    """
+    A thread or process pool that accepts at most `max_workers + queue_size`
+    tasks at a time. Callers beyond that wait up to `queue_timeout` seconds for
+    a free slot and then get an ExecutorSaturatedError.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kind: str = "thread",
+        max_workers: int = 1,
+        queue_size: int = 16,
+        queue_timeout: float = 30.0,
+        initializer: Callable = None,
+        start_method: str = None,
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown pool kind for '{name}': {kind}")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.initializer = initializer
+        self.start_method = start_method
+        self._executor = None
+        self._slots = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                pool_class = (
+                    ThreadPoolExecutor if self.kind == "thread" else ProcessPoolExecutor
+                )
+                kwargs = {"max_workers": self.max_workers}
+                if self.initializer is not None:
+                    kwargs["initializer"] = self.initializer
+                if self.kind == "thread":
+                    kwargs["thread_name_prefix"] = self.name
+                elif self.start_method is not None:
+                    kwargs["mp_context"] = multiprocessing.get_context(
+                        self.start_method
+                    )
+                self._executor = pool_class(**kwargs)
+                logger.info(
+                    "Started %s pool '%s' with %d workers",
+                    self.kind,
+                    self.name,
+                    self.max_workers,
+                )
+            return self._executor
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run `fn(*args, **kwargs)` in the pool and await its result.
+
+        :param fn: The callable to run. Must be picklable for process pools.
+        :return: The return value of the callable.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers + self.queue_size)
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise ExecutorSaturatedError(
+                f"The '{self.name}' pool is saturated, try again later"
+            )
+
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, functools.partial(fn, *args, **kwargs)
+            )
+        finally:
+            self._in_flight -= 1
+            self._slots.release()
+
+    @property
+    def idle_workers(self) -> int:
+        """
+        Workers not busy with a task right now.
+        """
+        return max(0, self.max_workers - self._in_flight)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "queue_size": self.queue_size,
+            "in_flight": self._in_flight,
+        }
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+class WorkloadPools:
+    """
+    Process-wide pools for CPU-bound work, configured per workload class with
+    the <NAME>_POOL_KIND, <NAME>_WORKERS and <NAME>_QUEUE_SIZE environment
+    variables (e.g. INFERENCE_WORKERS=2).
+    """
+
+    _defaults = {
+        # Models live in this process, so inference must run on threads
+        INFERENCE: "thread",
+        PDF_PARSE: "process",
+        PDF_RENDER: "process",
+        STT_PARALLEL: "process",
+    }
+    _pools: Dict[str, BoundedExecutor] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def configure(cls, name: str, **options) -> BoundedExecutor:
+        """
+        Create (or replace) the pool for a workload class.
+
+        :param name: Workload class name.
+        :param options: Keyword arguments for BoundedExecutor.
+        :return: The new pool.
+        """
+        with cls._lock:
+            previous = cls._pools.pop(name, None)
+            pool = BoundedExecutor(name, **options)
+            cls._pools[name] = pool
+        if previous is not None:
+            previous.shutdown(wait=False)
+        return pool
+
+    @classmethod
+    def get(cls, name: str, **options) -> BoundedExecutor:
+        """
+        Return the pool of a workload class, creating it from the environment on first use.
+
+        :param name: Workload class name.
+        :param options: Extra BoundedExecutor arguments used when the pool is created
+            (e.g. a worker initializer).
+        """
+        with cls._lock:
+            if name not in cls._pools:
+                prefix = name.upper()
+                cls._pools[name] = BoundedExecutor(
+                    name,
+                    kind=os.getenv(
+                        f"{prefix}_POOL_KIND", cls._defaults.get(name, "thread")
+                    ),
+                    max_workers=int(
+                        os.getenv(f"{prefix}_WORKERS", _default_workers(name))
+                    ),
+                    queue_size=int(os.getenv(f"{prefix}_QUEUE_SIZE", 16)),
+                    queue_timeout=float(os.getenv("EXECUTOR_QUEUE_TIMEOUT", 30)),
+                    **options,
+                )
+            return cls._pools[name]
+
+    @classmethod
+    def stats(cls) -> Dict[str, Dict[str, Any]]:
+        return {name: pool.stats() for name, pool in cls._pools.items()}
+
+    @classmethod
+    def shutdown(cls):
+        with cls._lock:
+            pools = list(cls._pools.values())
+            cls._pools.clear()
+        for pool in pools:
+            pool.shutdown()
+
+
+async def run_in_pool(name: str, fn: Callable, *args, **kwargs) -> Any:
+    """
+    Run a blocking callable in the pool of the given workload class.
+
+    :param name: Workload class (INFERENCE, PDF_PARSE or PDF_RENDER).
+    :param fn: The callable to run.
+    :return: The return value of the callable.
+    """
+    return await WorkloadPools.get(name).run(fn, *args, **kwargs)
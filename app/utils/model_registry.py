@@ -0,0 +1,142 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _load_entity_recognizer():
+    from app.services.pseudonymize import EntityRecognizer
+
+    return EntityRecognizer()
+
+
+def _load_stt():
+    from app.services.stt_service import STT
+
+    return STT()
+
+
+class ModelRegistry:
+    """
+    Process-wide registry for heavy ML models.
+
+    Each model is created lazily by its factory on first access and then shared
+    by every router in the process, so a worker holds exactly one copy of it.
+    """
+
+    ENTITY_RECOGNIZER = "entity_recognizer"
+    STT = "stt"
+
+    _factories: Dict[str, Callable[[], Any]] = {
+        ENTITY_RECOGNIZER: _load_entity_recognizer,
+        STT: _load_stt,
+    }
+    _instances: Dict[str, Any] = {}
+    _load_times: Dict[str, float] = {}
+    _locks: Dict[str, threading.Lock] = {}
+    _registry_lock = threading.Lock()
+
+    @classmethod
+    def register(cls, name: str, factory: Callable[[], Any]):
+        """
+        Register (or replace) the factory used to build a model.
+
+        :param name: Name the model is looked up by.
+        :param factory: Zero-argument callable returning the loaded model.
+        """
+        with cls._registry_lock:
+            cls._factories[name] = factory
+            cls._instances.pop(name, None)
+            cls._load_times.pop(name, None)
+
+    @classmethod
+    def _lock_for(cls, name: str) -> threading.Lock:
+        with cls._registry_lock:
+            if name not in cls._locks:
+                cls._locks[name] = threading.Lock()
+            return cls._locks[name]
+
+    @classmethod
+    def get(cls, name: str) -> Any:
+        """
+        Return the shared instance of a model, loading it on first use.
+
+        :param name: Name of a registered model.
+        :return: The loaded model instance.
+        """
+        instance = cls._instances.get(name)
+        if instance is not None:
+            return instance
+
+        if name not in cls._factories:
+            raise KeyError(f"Unknown model: {name}")
+
+        # Only one thread builds a given model; the others wait for it
+        with cls._lock_for(name):
+            instance = cls._instances.get(name)
+            if instance is None:
+                logger.info("Loading model '%s'", name)
+                start = time.perf_counter()
+                instance = cls._factories[name]()
+                cls._load_times[name] = time.perf_counter() - start
+                cls._instances[name] = instance
+                logger.info(
+                    "Model '%s' loaded in %.2fs", name, cls._load_times[name]
+                )
+        return instance
+
+    @classmethod
+    def get_entity_recognizer(cls):
+        return cls.get(cls.ENTITY_RECOGNIZER)
+
+    @classmethod
+    def get_stt(cls):
+        return cls.get(cls.STT)
+
+    @classmethod
+    def preload_names(cls) -> List[str]:
+        """
+        Models to load during application startup, taken from the PRELOAD_MODELS
+        environment variable ("all" by default, "none" to disable warmup).
+        """
+        value = os.getenv("PRELOAD_MODELS", "all").strip().lower()
+        if value == "none" or not value:
+            return []
+        if value == "all":
+            return list(cls._factories)
+        return [name.strip() for name in value.split(",") if name.strip()]
+
+    @classmethod
+    def warmup(cls, names: Optional[List[str]] = None):
+        """
+        Eagerly load the given models (by default the PRELOAD_MODELS set).
+
+        :param names: Names of the models to load.
+        """
+        for name in cls.preload_names() if names is None else names:
+            cls.get(name)
+
+    @classmethod
+    def is_loaded(cls, name: str) -> bool:
+        return name in cls._instances
+
+    @classmethod
+    def is_ready(cls) -> bool:
+        return all(cls.is_loaded(name) for name in cls.preload_names())
+
+    @classmethod
+    def status(cls) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "loaded": cls.is_loaded(name),
+                "load_seconds": (
+                    round(cls._load_times[name], 3)
+                    if name in cls._load_times
+                    else None
+                ),
+            }
+            for name in cls._factories
+        }
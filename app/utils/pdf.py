@@ -1,27 +1,23 @@
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-
-import plotly.express as px
-import pandas as pd
-import numpy as np
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch
-import seaborn as sns
-
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pandas as pd
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import Paragraph, Frame, PageBreak
+import os
+
+# Plotting and PDF libraries are imported inside the functions that use them
+# so that importing this module (and the HR panel routes) stays cheap.
 
 
 # Function to generate a PDF using ReportLab's built-in fonts (no local fonts)
 def generate_pdf_report(file_path: str, html_content: str):
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import inch
+    from reportlab.platypus import (
+        SimpleDocTemplate,
+        Paragraph,
+        Spacer,
+        Table,
+        TableStyle,
+    )
+
     # Create a PDF document
     doc = SimpleDocTemplate(file_path, pagesize=A4)
 
@@ -88,6 +84,17 @@ def generate_short_report(scores_dic, overall_assesment="", filename="test.pdf")
         overall_assesment (string): Overall assessment of the interviewee
         filename (string): Output PDF filename
     """
+    import matplotlib.pyplot as plt
+    import numpy as np
+    import pandas as pd
+    import plotly.express as px
+    import seaborn as sns
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    # Keep the chart images next to the report so concurrent reports do not collide
+    heatmap_path = f"{os.path.splitext(filename)[0]}_heatmap.png"
+    radar_chart_path = f"{os.path.splitext(filename)[0]}_radar_chart.png"
 
     # Preprocess the scores_dic
     scores = []
@@ -122,14 +129,14 @@ def generate_short_report(scores_dic, overall_assesment="", filename="test.pdf")
     plt.xlabel("")
     plt.ylabel("")
     plt.title("Heatmap of Applicant Answer Evaluations by Question", fontsize=14)
-    plt.savefig("assets/Heatmap.png", transparent=True)
+    plt.savefig(heatmap_path, transparent=True)
     plt.close()
 
     # Generate Radar Chart
     df = pd.DataFrame(dict(r=average_scores, theta=metrics))
     fig = px.line_polar(df, r="r", theta="theta", line_close=True, range_r=[0, 1])
     fig.update_traces(fill="toself")
-    fig.write_image("assets/Radar_chart.png")
+    fig.write_image(radar_chart_path)
 
     # Create PDF
     pdf = canvas.Canvas(filename, pagesize=letter)
@@ -154,7 +161,7 @@ def generate_short_report(scores_dic, overall_assesment="", filename="test.pdf")
     # Heatmap Page
     pdf.setFont("Helvetica-Bold", 16)
     pdf.drawString(30, 750, "Heatmap of Applicant Answer Evaluations")
-    pdf.drawImage("assets/Heatmap.png", 50, 450, width=500, height=250)
+    pdf.drawImage(heatmap_path, 50, 450, width=500, height=250)
     pdf.setFont("Helvetica", 12)
     pdf.drawString(
         30,
@@ -169,7 +176,7 @@ def generate_short_report(scores_dic, overall_assesment="", filename="test.pdf")
     # Radar Chart Page
     pdf.setFont("Helvetica-Bold", 16)
     pdf.drawString(30, 750, "Performance Evaluation Across Key Metrics")
-    pdf.drawImage("assets/Radar_chart.png", 50, 450, width=500, height=250)
+    pdf.drawImage(radar_chart_path, 50, 450, width=500, height=250)
     pdf.setFont("Helvetica", 12)
     pdf.drawString(
         30,
@@ -0,0 +1,135 @@
+import asyncio
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+from dotenv import load_dotenv
+from app.services.chatbot.hr_agent import HRQuestionnaireAgent
+from app.utils.file_reader import get_hr_config
+
+load_dotenv()
+
+SESSION_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+class InterviewSession:
+    def __init__(self, session_id: str, agent: HRQuestionnaireAgent):
+        """
+        State of one candidate's interview.
+
+        :param session_id: Identifier of the interview.
+        :param agent: The questionnaire agent driving this interview.
+        """
+        self.session_id = session_id
+        self.agent = agent
+        self.created_at = time.monotonic()
+        self.last_access = self.created_at
+        # Spoken language, pinned after the first transcribed answer
+        self.language = None
+        # Turns of one interview are processed one at a time
+        self.lock = asyncio.Lock()
+        # Task recording a streamed clarification that may outlive its response
+        self.pending_turn: Optional[asyncio.Task] = None
+
+    def touch(self):
+        self.last_access = time.monotonic()
+
+
+class SessionStore:
+    def __init__(self, max_sessions: int = 500, idle_ttl: float = 3600):
+        """
+        In-memory interview sessions with an LRU cap and idle TTL eviction.
+
+        :param max_sessions: Maximum number of sessions kept; the least recently used is evicted first.
+        :param idle_ttl: Seconds after which an untouched session is evicted.
+        """
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, agent: HRQuestionnaireAgent, session_id: str = None) -> InterviewSession:
+        """
+        Store a new session, replacing any existing session with the same id.
+
+        :param agent: The questionnaire agent of the interview.
+        :param session_id: Identifier to use; a random one is generated when omitted.
+        :return: The stored session.
+        """
+        session = InterviewSession(
+            validate_session_id(session_id) if session_id else uuid.uuid4().hex,
+            agent,
+        )
+        with self._lock:
+            self._evict_expired()
+            self._sessions[session.session_id] = session
+            self._sessions.move_to_end(session.session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
+
+    def get(self, session_id: str) -> Optional[InterviewSession]:
+        """
+        Return a session and mark it as recently used, or None if it does not exist or expired.
+        """
+        with self._lock:
+            self._evict_expired()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.touch()
+                self._sessions.move_to_end(session_id)
+        return session
+
+    def remove(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _evict_expired(self):
+        # Sessions are ordered by last access, so expired ones are at the front
+        deadline = time.monotonic() - self.idle_ttl
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.last_access > deadline:
+                break
+            self._sessions.popitem(last=False)
+
+
+session_store = SessionStore(
+    max_sessions=int(os.getenv("MAX_SESSIONS", 500)),
+    idle_ttl=float(os.getenv("SESSION_IDLE_TTL", 3600)),
+)
+
+
+async def create_session(session_id: str = None, cv_data: dict = None) -> InterviewSession:
+    """
+    Build a questionnaire agent from the current HR config and store it as a new session.
+
+    :param session_id: Identifier to use; a random one is generated when omitted.
+    :param cv_data: The candidate's segmented CV. Read from disk when omitted.
+    :return: The stored session.
+    """
+    # Reject a bad id before paying for the agent's LLM calls
+    if session_id:
+        validate_session_id(session_id)
+    agent = await HRQuestionnaireAgent.create_async(
+        api_key=os.getenv("OPENAI_API_KEY"), config=get_hr_config(), cv_data=cv_data
+    )
+    return session_store.put(agent, session_id)
+
+
+def validate_session_id(session_id: str) -> str:
+    """
+    Check that a client supplied session id is safe to use in file names.
+
+    :param session_id: The session id to check.
+    :return: The session id.
+    """
+    if not SESSION_ID_PATTERN.fullmatch(session_id):
+        raise ValueError(f"Invalid session id: {session_id!r}")
+    return session_id
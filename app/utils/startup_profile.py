@@ -0,0 +1,102 @@
+import argparse
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# Matches lines like "import time:       512 |       1024 |     package.module"
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)")
+
+
+def collect_import_times(module: str = "app.main") -> List[Tuple[str, int, int, int]]:
+    """
+    Import a module in a fresh interpreter with `-X importtime` and parse the result.
+
+    :param module: Dotted name of the module to import.
+    :return: A list of (module, self_us, cumulative_us, depth) tuples in import order.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        # The import time lines are still useful up to the failure, but say so
+        tail = result.stderr.strip().splitlines()[-1:] or ["unknown error"]
+        print(f"warning: importing {module} failed: {tail[0]}", file=sys.stderr)
+
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        depth = (len(indent) - 1) // 2
+        entries.append((name, int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def summarize_by_package(
+    entries: List[Tuple[str, int, int, int]]
+) -> Dict[str, int]:
+    """
+    Sum the self import time of every module per top-level package.
+
+    :param entries: Output of collect_import_times.
+    :return: A mapping of top-level package name to total microseconds.
+    """
+    totals = defaultdict(int)
+    for name, self_us, _, _ in entries:
+        totals[name.split(".")[0]] += self_us
+    return dict(totals)
+
+
+def print_report(module: str = "app.main", budget_ms: float = 1000, top: int = 20) -> int:
+    """
+    Print the per-package and per-module import cost of a module.
+
+    :param module: Dotted name of the module to profile.
+    :param budget_ms: Import time budget in milliseconds.
+    :param top: Number of rows to print in each table.
+    :return: 0 if the import fits in the budget, 1 otherwise.
+    """
+    entries = collect_import_times(module)
+    total_ms = sum(self_us for _, self_us, _, _ in entries) / 1000
+
+    print(f"Import time budget report for '{module}'\n")
+    print(f"{'package':<40} {'self ms':>10}")
+    packages = sorted(
+        summarize_by_package(entries).items(), key=lambda item: item[1], reverse=True
+    )
+    for package, self_us in packages[:top]:
+        print(f"{package:<40} {self_us / 1000:>10.1f}")
+
+    print(f"\n{'app module':<40} {'cumulative ms':>14}")
+    app_modules = sorted(
+        (entry for entry in entries if entry[0].startswith("app")),
+        key=lambda entry: entry[2],
+        reverse=True,
+    )
+    for name, _, cumulative_us, _ in app_modules[:top]:
+        print(f"{name:<40} {cumulative_us / 1000:>14.1f}")
+
+    within_budget = total_ms <= budget_ms
+    print(
+        f"\nTotal: {total_ms:.1f} ms (budget {budget_ms:.0f} ms) - "
+        f"{'OK' if within_budget else 'OVER BUDGET'}"
+    )
+    return 0 if within_budget else 1
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Report per-module import cost.")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=1000)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args(argv)
+    return print_report(args.module, args.budget_ms, args.top)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+from typing import List, Tuple
+import numpy as np
+from app.utils.audio import SAMPLE_RATE
+
+
+def speech_segments(
+    audio: np.ndarray,
+    sr: int = SAMPLE_RATE,
+    frame_ms: int = 30,
+    min_threshold_db: float = -50.0,
+    margin_db: float = 12.0,
+    min_speech_ms: int = 90,
+) -> List[Tuple[int, int]]:
+    """
+    Find the regions of a recording that contain speech using frame energy.
+
+    A frame counts as speech when its RMS level is above both `min_threshold_db`
+    (dBFS) and the estimated noise floor plus `margin_db`. The noise floor is
+    the 10th percentile of the frame levels, so it adapts to the microphone.
+
+    :param audio: Mono float32 samples in [-1, 1].
+    :param sr: Sampling rate of the audio.
+    :param frame_ms: Frame length in milliseconds.
+    :param min_threshold_db: Frames quieter than this are never speech.
+    :param margin_db: Required level above the noise floor.
+    :param min_speech_ms: Shorter bursts (clicks, pops) are ignored.
+    :return: A list of (start, end) sample indices.
+    """
+    frame = int(sr * frame_ms / 1000)
+    frames = len(audio) // frame
+    if frames == 0:
+        return []
+
+    power = np.square(audio[: frames * frame], dtype=np.float32).reshape(frames, frame)
+    level_db = 10 * np.log10(power.mean(axis=1) + 1e-10)
+    threshold = max(min_threshold_db, np.percentile(level_db, 10) + margin_db)
+    # A recording that is all speech has no quiet frames to estimate noise from
+    if np.percentile(level_db, 90) - np.percentile(level_db, 10) < margin_db:
+        threshold = min_threshold_db
+    is_speech = level_db > threshold
+
+    segments = []
+    min_frames = max(1, min_speech_ms // frame_ms)
+    # Boundaries where the speech flag flips
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], is_speech.astype(np.int8), [0]))))
+    for start, end in zip(edges[::2], edges[1::2]):
+        if end - start >= min_frames:
+            segments.append((start * frame, end * frame))
+    return segments
+
+
+def trim_silence(
+    audio: np.ndarray,
+    sr: int = SAMPLE_RATE,
+    max_pause: float = 0.5,
+    padding: float = 0.2,
+) -> np.ndarray:
+    """
+    Remove leading and trailing silence and shorten long internal pauses.
+
+    :param audio: Mono float32 samples in [-1, 1].
+    :param sr: Sampling rate of the audio.
+    :param max_pause: Internal pauses are shortened to at most this many seconds.
+    :param padding: Seconds of context kept around each speech region.
+    :return: The trimmed audio; empty if the recording contains no speech.
+    """
+    segments = speech_segments(audio, sr)
+    if not segments:
+        return audio[:0]
+
+    pad = int(padding * sr)
+    max_gap = int(max_pause * sr)
+
+    # Pad the speech regions and merge the ones that now touch
+    merged = []
+    for start, end in segments:
+        start, end = max(0, start - pad), min(len(audio), end + pad)
+        if merged and start - merged[-1][1] <= max_gap:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    if len(merged) == 1:
+        start, end = merged[0]
+        return audio[start:end]
+
+    # Keep a short pause between regions so Whisper still sees a sentence break
+    pause = np.zeros(max_gap, dtype=audio.dtype)
+    pieces = []
+    for i, (start, end) in enumerate(merged):
+        if i:
+            pieces.append(pause)
+        pieces.append(audio[start:end])
+    return np.concatenate(pieces)
+
+
+def split_at_silence(
+    audio: np.ndarray,
+    sr: int = SAMPLE_RATE,
+    max_seconds: float = 30.0,
+    min_seconds: float = 10.0,
+) -> List[Tuple[int, int]]:
+    """
+    Cut a long recording into chunks that end in pauses between speech regions.
+
+    Each chunk is at most `max_seconds` long. A chunk is closed at the middle of
+    the last pause that keeps it under the limit, provided it is already
+    `min_seconds` long; speech that runs past the limit without any pause is
+    cut hard.
+
+    :param audio: Mono float32 samples in [-1, 1].
+    :param sr: Sampling rate of the audio.
+    :param max_seconds: Maximum chunk length.
+    :param min_seconds: Chunks are not cut at a pause before this length.
+    :return: A list of (start, end) sample indices covering the whole recording.
+    """
+    max_len = int(max_seconds * sr)
+    min_len = int(min_seconds * sr)
+    if len(audio) <= max_len:
+        return [(0, len(audio))]
+
+    segments = speech_segments(audio, sr)
+    # Candidate cut points are the middles of the pauses between speech regions
+    pauses = [
+        int(end + next_start) // 2
+        for (_, end), (next_start, _) in zip(segments, segments[1:])
+    ]
+
+    chunks = []
+    start = 0
+    while len(audio) - start > max_len:
+        limit = start + max_len
+        cuts = [cut for cut in pauses if start + min_len <= cut <= limit]
+        end = cuts[-1] if cuts else limit
+        chunks.append((start, end))
+        start = end
+    chunks.append((start, len(audio)))
+    return chunks
@@ -0,0 +1,104 @@
+"""
+Compare the old temp-file upload handling with in-memory decoding.
+
+Usage:
+    python -m benchmarks.bench_media_io [--audio answer.wav] [--pdf cv.pdf] [--runs 20]
+
+Without arguments a synthetic 20 s WAV and a generated two page PDF are used.
+"""
+
+import argparse
+import io
+import os
+import statistics
+import tempfile
+import time
+import numpy as np
+from app.services.cv_extraction_service import CVProcessor
+from app.utils.audio import SAMPLE_RATE, decode_audio
+
+
+def _synthetic_wav(seconds: int = 20, sr: int = 44100) -> bytes:
+    import soundfile as sf
+
+    t = np.arange(seconds * sr) / sr
+    audio = 0.1 * np.sin(2 * np.pi * 220 * t).astype(np.float32)
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, sr, format="WAV")
+    return buffer.getvalue()
+
+
+def _synthetic_pdf(pages: int = 2) -> bytes:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    for page in range(pages):
+        for line in range(40):
+            pdf.drawString(50, 800 - line * 18, f"Page {page} line {line}: experience")
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def _load_from_disk(audio_bytes: bytes) -> np.ndarray:
+    # The previous route behaviour: write the upload, then load it back
+    path = os.path.join(tempfile.gettempdir(), "temp_audio_file.wav")
+    with open(path, "wb") as f:
+        f.write(audio_bytes)
+    try:
+        import librosa
+
+        audio, _ = librosa.load(path, sr=SAMPLE_RATE)
+    except ImportError:
+        import soundfile as sf
+
+        audio, _ = sf.read(path, dtype="float32")
+    os.remove(path)
+    return audio
+
+
+def _extract_from_disk(pdf_bytes: bytes) -> str:
+    path = os.path.join(tempfile.gettempdir(), "temp.pdf")
+    with open(path, "wb") as f:
+        f.write(pdf_bytes)
+    return CVProcessor.extract_text_from_cv(path)
+
+
+def _time(fn, payload, runs: int) -> float:
+    fn(payload)  # warm up imports and caches
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(payload)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--audio")
+    parser.add_argument("--pdf")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    audio_bytes = open(args.audio, "rb").read() if args.audio else _synthetic_wav()
+    pdf_bytes = open(args.pdf, "rb").read() if args.pdf else _synthetic_pdf()
+
+    rows = [
+        ("audio: temp file + load", _time(_load_from_disk, audio_bytes, args.runs)),
+        ("audio: in-memory decode", _time(decode_audio, audio_bytes, args.runs)),
+        ("pdf: temp file + extract", _time(_extract_from_disk, pdf_bytes, args.runs)),
+        (
+            "pdf: in-memory extract",
+            _time(CVProcessor.extract_text_from_cv, pdf_bytes, args.runs),
+        ),
+    ]
+    print(f"{'case':<28} {'median ms':>10}")
+    for name, ms in rows:
+        print(f"{name:<28} {ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
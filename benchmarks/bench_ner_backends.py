@@ -0,0 +1,94 @@
+"""
+Accuracy parity and throughput of the NER backends.
+
+Usage:
+    python -m benchmarks.bench_ner_backends [--corpus path/to/texts] [--runs 3] [--min-f1 0.95]
+
+The torch pipeline is the reference. For every other backend the entities
+found on each text are compared with the reference (entity text and type)
+and the micro F1 is reported next to texts per second. Without --corpus a
+fixed built-in corpus is used; a corpus directory holds .txt files. The
+exit status is 1 when a backend's F1 is below --min-f1, so the check can
+gate a switch of NER_BACKEND. The NER result cache is disabled for the
+measurement.
+"""
+
+import argparse
+import os
+import sys
+import time
+from app.services.pseudonymize import NER_BACKENDS, EntityRecognizer
+
+CORPUS = [
+    "My name is Sarah Johnson and I worked at Google in Zurich for three years.",
+    "Before that I was a data analyst at Deutsche Bank in Frankfurt.",
+    "I studied computer science at ETH Zurich under Professor Thomas Hofmann.",
+    "Our team lead, Maria Garcia, moved from Microsoft to Amazon last spring.",
+    "I grew up in Lyon and later moved to Berlin to join Zalando.",
+    "At Siemens I coordinated a project with partners from Toyota and Bosch.",
+    "Yes, I worked in a team of five engineers.",
+    "I led the migration of our billing platform to Kubernetes.",
+    "John Smith from Accenture recommended me for the role in London.",
+    "I volunteered with the Red Cross in Nairobi during my gap year.",
+    "Ahmed Hassan and I presented our paper at the NeurIPS conference in Vancouver.",
+    "My last employer was Spotify, where I worked on the recommendation system in Stockholm.",
+]
+
+
+def _load_corpus(directory: str):
+    texts = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".txt"):
+            with open(os.path.join(directory, name)) as f:
+                texts.append(f.read())
+    return texts
+
+
+def _f1(reference, predicted) -> float:
+    true_positives = sum(len(r.items() & p.items()) for r, p in zip(reference, predicted))
+    found = sum(len(p) for p in predicted)
+    expected = sum(len(r) for r in reference)
+    if not found and not expected:
+        return 1.0
+    precision = true_positives / found if found else 0.0
+    recall = true_positives / expected if expected else 0.0
+    return 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--min-f1", type=float, default=0.95)
+    args = parser.parse_args()
+
+    texts = _load_corpus(args.corpus) if args.corpus else CORPUS
+    if not texts:
+        raise SystemExit(f"No .txt files in {args.corpus}")
+
+    reference = None
+    failed = False
+    print(f"{'backend':<8} {'load s':>7} {'texts/s':>9} {'F1':>6}")
+    for backend in NER_BACKENDS:
+        start = time.perf_counter()
+        # Without the NER cache, so repeated runs measure the backend and not cache hits
+        recognizer = EntityRecognizer(backend=backend, cache=None)
+        load = time.perf_counter() - start
+
+        recognizer.identify_entities(texts[0])  # warm up
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            predicted = [recognizer.identify_entities(text) for text in texts]
+        throughput = args.runs * len(texts) / (time.perf_counter() - start)
+
+        if reference is None:
+            reference = predicted
+        f1 = _f1(reference, predicted)
+        failed = failed or f1 < args.min_f1
+        print(f"{backend:<8} {load:>7.1f} {throughput:>9.1f} {f1:>6.3f}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Compare the previous pdfplumber-first CV text extraction with the page-level engine.
+
+Usage:
+    python -m benchmarks.bench_pdf_extraction [--corpus path/to/cvs] [--runs 3]
+
+The corpus directory holds PDF files. Without --corpus, synthetic CVs of
+2, 8 and 24 pages are generated. For every document the script reports the
+previous extraction, the page-level extraction in one process and the
+parallel extraction through the PDF_PARSE pool, together with the number
+of pages that needed pdfplumber.
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import statistics
+import time
+from app.services.cv_extraction_service import CVProcessor
+from app.utils.executors import WorkloadPools
+
+
+def _previous_extraction(pdf_bytes: bytes) -> str:
+    # The extraction used before: pdfplumber first, extract_text() twice per page
+    import pdfplumber
+    from pypdf import PdfReader
+
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        pages = [page.extract_text() for page in pdf.pages if page.extract_text()]
+    if not pages:
+        reader = PdfReader(io.BytesIO(pdf_bytes))
+        pages = [page.extract_text() for page in reader.pages]
+    return CVProcessor.clean_text("\n\n".join(pages))
+
+
+def _synthetic_cv(pages: int) -> bytes:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    for page in range(pages):
+        pdf.drawString(50, 800, f"Curriculum Vitae - page {page + 1}")
+        for line in range(42):
+            pdf.drawString(
+                50,
+                780 - line * 18,
+                f"2019-2023 Senior engineer at Example Corp, project {page}.{line}: "
+                "built data pipelines and led a team of four",
+            )
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def _load_corpus(directory: str):
+    corpus = []
+    for name in sorted(os.listdir(directory)):
+        if name.lower().endswith(".pdf"):
+            with open(os.path.join(directory, name), "rb") as f:
+                corpus.append((name, f.read()))
+    return corpus
+
+
+def _escalated(pdf_bytes: bytes) -> int:
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    return sum(not CVProcessor.page_text_ok(page.extract_text()) for page in reader.pages)
+
+
+def _best(fn, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+async def _run(corpus, runs: int):
+    print(
+        f"{'document':<24} {'pages':>5} {'plumber':>7} {'previous ms':>12} "
+        f"{'page-level ms':>14} {'parallel ms':>12}"
+    )
+    totals = [[], [], []]
+    for name, pdf_bytes in corpus:
+        previous = _best(lambda: _previous_extraction(pdf_bytes), runs)
+        page_level = _best(lambda: CVProcessor.extract_text_from_cv(pdf_bytes), runs)
+
+        await CVProcessor.extract_text_from_cv_async(pdf_bytes)  # start the workers
+        parallel = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            await CVProcessor.extract_text_from_cv_async(pdf_bytes)
+            parallel.append(time.perf_counter() - start)
+
+        for total, value in zip(totals, (previous, page_level, min(parallel))):
+            total.append(value)
+        print(
+            f"{name[:24]:<24} {CVProcessor.page_count(pdf_bytes):>5} {_escalated(pdf_bytes):>7} "
+            f"{previous * 1000:>12.1f} {page_level * 1000:>14.1f} {min(parallel) * 1000:>12.1f}"
+        )
+    print(
+        f"{'mean':<24} {'':>5} {'':>7} {statistics.mean(totals[0]) * 1000:>12.1f} "
+        f"{statistics.mean(totals[1]) * 1000:>14.1f} {statistics.mean(totals[2]) * 1000:>12.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus = _load_corpus(args.corpus)
+        if not corpus:
+            raise SystemExit(f"No PDF files in {args.corpus}")
+    else:
+        corpus = [(f"synthetic-{pages}p.pdf", _synthetic_cv(pages)) for pages in (2, 8, 24)]
+
+    try:
+        asyncio.run(_run(corpus, args.runs))
+    finally:
+        WorkloadPools.shutdown()
+
+
+if __name__ == "__main__":
+    main()
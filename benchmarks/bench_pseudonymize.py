@@ -0,0 +1,100 @@
+"""
+Compare per-entity re.sub substitution with the single-pass trie substitution.
+
+Usage:
+    python -m benchmarks.bench_pseudonymize [--entities 10000] [--words 20000] [--runs 3]
+
+A synthetic text mixes random filler words with mentions of the entities.
+Entity recognition is not part of the measurement: the map is filled up
+front, so only substitution in both directions is timed.
+"""
+
+import argparse
+import random
+import re
+import string
+import time
+from app.services.pseudonymize import AnonymizationProcessor
+
+
+class _KnownEntities:
+    """Stands in for the NER model; the entities are registered beforehand."""
+
+    def identify_entities(self, text):
+        return {}
+
+
+def _word(rng: random.Random, length: int) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(length))
+
+
+def _legacy_anonymize(entities, text: str) -> str:
+    # The substitution loop used before: one pass over the text per entity
+    for entity, pseudonym in entities.items():
+        text = re.sub(rf"\b{re.escape(entity)}\b", pseudonym, text)
+    return text
+
+
+def _legacy_reverse(entity_map, text: str) -> str:
+    for pseudonym, entity in entity_map.items():
+        text = re.sub(rf"\b{re.escape(pseudonym)}\b", entity, text)
+    return text
+
+
+def _timed(fn, *args, runs: int):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entities", type=int, default=10000)
+    parser.add_argument("--words", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    processor = AnonymizationProcessor(_KnownEntities())
+    entities = sorted(
+        {f"{_word(rng, rng.randint(4, 8))} {_word(rng, rng.randint(4, 10))}" for _ in range(args.entities)}
+    )
+    for entity in entities:
+        processor.pseudonym_for(entity, rng.choice(["PER", "ORG", "LOC"]))
+
+    words = [
+        rng.choice(entities) if rng.random() < 0.1 else _word(rng, rng.randint(2, 9))
+        for _ in range(args.words)
+    ]
+    text = " ".join(words)
+
+    # Build the compiled substitutions outside the timed region
+    start = time.perf_counter()
+    anonymized = processor.anonymize_text(text)
+    processor.reverse_anonymization(anonymized)
+    build = time.perf_counter() - start
+
+    legacy, legacy_forward = _timed(
+        _legacy_anonymize, processor.pseudonyms, text, runs=args.runs
+    )
+    single, single_forward = _timed(processor.anonymize_text, text, runs=args.runs)
+    restored, single_reverse = _timed(
+        processor.reverse_anonymization, single, runs=args.runs
+    )
+    _, legacy_reverse = _timed(
+        _legacy_reverse, processor.entity_map, single, runs=args.runs
+    )
+
+    print(f"{len(entities)} entities, {len(text)} characters of text")
+    print(f"first call incl. pattern compilation: {build * 1000:.1f} ms")
+    print(f"{'':<12} {'forward ms':>11} {'reverse ms':>11}")
+    print(f"{'per-entity':<12} {legacy_forward * 1000:>11.1f} {legacy_reverse * 1000:>11.1f}")
+    print(f"{'single-pass':<12} {single_forward * 1000:>11.1f} {single_reverse * 1000:>11.1f}")
+    print(f"round trip exact: {restored == text}, matches per-entity output: {legacy == single}")
+
+
+if __name__ == "__main__":
+    main()
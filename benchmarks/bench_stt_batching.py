@@ -0,0 +1,76 @@
+"""
+Latency and throughput of the Whisper micro-batcher for different batch windows.
+
+Usage:
+    python -m benchmarks.bench_stt_batching [--audio answer.wav] [--requests 32]
+        [--concurrency 8] [--windows 0,5,10,25,50] [--max-batch-size 8]
+
+Each configuration fires `requests` transcriptions with at most `concurrency`
+in flight. A window of 0 ms with batch size 1 is the unbatched baseline.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import numpy as np
+from app.services.stt_batcher import TranscriptionBatcher
+from app.services.stt_service import STT
+from app.utils.audio import SAMPLE_RATE, decode_audio
+
+
+async def _run(batcher: TranscriptionBatcher, audio, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await batcher.transcribe(audio)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    await batcher.close()
+    latencies.sort()
+    return (
+        requests / elapsed,
+        statistics.median(latencies) * 1000,
+        latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--audio")
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--windows", default="0,5,10,25,50")
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    args = parser.parse_args()
+
+    if args.audio:
+        audio = decode_audio(open(args.audio, "rb").read())
+    else:
+        # 5 s of low noise stands in for a short answer
+        audio = (0.01 * np.random.randn(5 * SAMPLE_RATE)).astype(np.float32)
+
+    asyncio.run(_compare(STT(), audio, args))
+
+
+async def _compare(stt: STT, audio, args):
+    configs = [(0, 1)] + [
+        (float(window), args.max_batch_size) for window in args.windows.split(",")
+    ]
+    print(f"{'window ms':>10} {'batch':>6} {'clips/s':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for window, batch_size in configs:
+        batcher = TranscriptionBatcher(stt, max_batch_size=batch_size, max_wait_ms=window)
+        throughput, p50, p95 = await _run(
+            batcher, audio, args.requests, args.concurrency
+        )
+        print(f"{window:>10.0f} {batch_size:>6} {throughput:>9.2f} {p50:>9.1f} {p95:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
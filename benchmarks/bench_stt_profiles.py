@@ -0,0 +1,115 @@
+"""
+Word error rate against latency for each Whisper decode profile.
+
+Usage:
+    python -m benchmarks.bench_stt_profiles --corpus path/to/corpus [--language en]
+
+The corpus directory holds audio files (wav, mp3, webm, ...) with a reference
+transcript next to each one (answer1.wav + answer1.txt). Every profile is run
+with the fp32 model and with int8 dynamic quantisation, both with language
+detection and with the language pinned. The serialised size of each model
+and its number of int8 Linear layers are printed first, so a quantisation
+that silently did nothing shows up.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import time
+from app.services.stt_service import DECODE_PROFILES, STT
+from app.utils.audio import decode_audio
+
+
+def _words(text: str):
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    Word-level Levenshtein distance divided by the reference length.
+    """
+    ref, hyp = _words(reference), _words(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (ref_word != hyp_word),
+                )
+            )
+        previous = current
+    return previous[-1] / max(1, len(ref))
+
+
+def _model_size(model):
+    """
+    Serialised size of the model in MB and its number of int8 Linear layers.
+    """
+    import io
+    import torch
+
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    quantized = sum(
+        isinstance(module, torch.ao.nn.quantized.dynamic.Linear) for module in model.modules()
+    )
+    return buffer.tell() / (1024 * 1024), quantized
+
+
+def _load_corpus(directory: str):
+    corpus = []
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        reference_path = os.path.join(directory, stem + ".txt")
+        if ext == ".txt" or not os.path.exists(reference_path):
+            continue
+        with open(os.path.join(directory, name), "rb") as f:
+            audio = decode_audio(f.read())
+        with open(reference_path) as f:
+            corpus.append((audio, f.read()))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", required=True)
+    parser.add_argument("--language", default="en")
+    args = parser.parse_args()
+
+    corpus = _load_corpus(args.corpus)
+    if not corpus:
+        raise SystemExit(f"No audio with a reference transcript in {args.corpus}")
+
+    rows = []
+    for quantize in ("none", "int8"):
+        stt = STT(quantize=quantize)
+        size, quantized = _model_size(stt.model)
+        print(
+            f"{'int8' if quantize == 'int8' else 'fp32'}: {size:.1f} MB, "
+            f"{quantized} int8 Linear layers"
+        )
+        for profile in DECODE_PROFILES:
+            for language in (None, args.language):
+                stt.transcribe(corpus[0][0], language, profile)  # warm up
+                errors, latencies = [], []
+                for audio, reference in corpus:
+                    start = time.perf_counter()
+                    text = stt.execute(audio, language, profile)
+                    latencies.append(time.perf_counter() - start)
+                    errors.append(word_error_rate(reference, text))
+                rows.append(
+                    f"{'int8' if quantize == 'int8' else 'fp32':<6} {profile:<9} "
+                    f"{language or 'detect':<9} {statistics.mean(errors):>7.3f} "
+                    f"{statistics.mean(latencies) * 1000:>9.1f}"
+                )
+
+    print(f"\n{'model':<6} {'profile':<9} {'language':<9} {'WER':>7} {'mean ms':>9}")
+    print("\n".join(rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+from app.services.pseudonymize import AnonymizationProcessor, RuleDetector
+
+
+class _NoEntities:
+    def identify_entities(self, text):
+        return {}
+
+
+class _RulesOnly:
+    """Detects like EntityRecognizer without the model: rules on the normalised text."""
+
+    def __init__(self, rules):
+        self.rules = rules
+
+    def identify_entities(self, text):
+        return self.rules.detect(" ".join(text.lower().split()))[0]
+
+
+def test_gazetteer_entry_inside_a_word_is_not_matched():
+    rules = RuleDetector({"ORG": ["acme"]})
+    assert rules.detect("i worked at nacme corp") == ({}, "i worked at nacme corp")
+    assert rules.detect("acmes") == ({}, "acmes")
+    assert rules.detect("i worked at acme corp")[0] == {"acme": "ORG"}
+
+
+def test_phone_number_with_a_prefix_is_not_matched():
+    rules = RuleDetector()
+    assert rules.detect("ref x123456789012")[0] == {}
+    assert rules.detect("price 1 234 567 890 eur")[0] == {}
+
+
+def test_phone_email_and_url_are_matched_as_whole_tokens():
+    rules = RuleDetector()
+    entities, masked = rules.detect("call +49 151 2345 6789 or mail a.b@x.com, see www.x.com/cv.")
+    assert entities == {
+        "+49 151 2345 6789": "PHONE",
+        "a.b@x.com": "EMAIL",
+        "www.x.com/cv": "URL",
+    }
+    assert "@" not in masked and "151" not in masked
+
+
+def test_gazetteer_types_get_distinct_pseudonyms():
+    processor = AnonymizationProcessor(_NoEntities())
+    skill = processor.pseudonym_for("python", "SKILL")
+    title = processor.pseudonym_for("cto", "TITLE")
+    assert skill.startswith("skill_") and title.startswith("title_")
+    assert processor.reverse_anonymization(f"{skill} and {title}") == "python and cto"
+
+
+
+def test_entities_split_by_newlines_or_double_spaces_are_replaced():
+    processor = AnonymizationProcessor(_RulesOnly(RuleDetector({"PER": ["jane doe"]})))
+    text = "Phone: +49 151  2345 6789\nJane\n  Doe, +49 151\n2345 6789"
+    anonymized = processor.anonymize_text(text)
+    assert "2345" not in anonymized and "jane" not in anonymized and "doe" not in anonymized
+    assert processor.reverse_anonymization(anonymized) == (
+        "phone: +49 151 2345 6789\njane doe, +49 151 2345 6789"
+    )